@@ -1,150 +1,472 @@
 # This file provides codes of branch_and_bound algorithm for minimum set cover problem
 # Regarding as initial upper bound, it is calculated by greedy algorithm
-# The low bound for Union U and subsets Si is calculated by fractional greedy bound
+# The low bound for Union U and subsets Si is calculated by fractional greedy bound or by Lagrangian relaxation
+# (see bnb_bounds.py)
 
 
 from typing import List, Set, Tuple
 import heapq
 import time
 import os
+import sys
+import json
+import glob
+
+from set_cover_instance import load_instance, elements_of
+from bnb_bounds import make_bound, TieredBound
+from bnb_reduction import reduce_instance
+from bnb_checkpoint import save_checkpoint, load_checkpoint
+from bnb_stats import SearchStats, TimedBound
+from bnb_transposition import TranspositionTable
+from solver_control import SolverControl
 
 
 def initial_upper_bound(universe, subsets):
     '''
     Calculate the initial_upper_bound by greedy algorithm. Choose the subset with most uncovered elements in subset of
     universe each time.
-    :param universe: Initial union
-    :param subsets: subsets provided by inputs
-    :return: number of subsets for set cover by greedy algorithm and the corresponding set cover
+    :param universe: bitmask of the initial union
+    :param subsets: subset bitmasks provided by inputs
+    :return: number of subsets for set cover by greedy algorithm and the corresponding set cover (1-based indices)
     '''
 
-    uncovered = set(universe)
+    uncovered = universe
     selected = []
-    used_indices = set()
 
     while uncovered:
-        best_index, best_res = max(
-            ((i, s) for i, s in enumerate(subsets) if i not in used_indices),
-            key=lambda x: len(x[1] & uncovered),
-            default=(None, set())
-        )
-        if not best_res:
+        # subsets already selected have no uncovered elements left, so they never win the max
+        best_index = max(range(len(subsets)), key=lambda i: (subsets[i] & uncovered).bit_count(), default=None)
+        if best_index is None or not subsets[best_index] & uncovered:
             return float('inf'), []
-        uncovered -= best_res
-        used_indices.add(best_index)
-        selected.append(best_index)
+        uncovered &= ~subsets[best_index]
+        selected.append(best_index + 1)
     return len(selected), selected
 
 
+def remove_redundant(selected, subsets):
+    '''
+    Drop subsets of a cover whose elements are all covered by the other chosen subsets, smallest subsets first.
+    :param selected: cover as 1-based subset indices
+    :param subsets: subset bitmasks
+    :return: the remaining cover, in the original order
+    '''
+    kept = list(selected)
+    for i in sorted(selected, key=lambda i: subsets[i - 1].bit_count()):
+        others = 0
+        for j in kept:
+            if j != i:
+                others |= subsets[j - 1]
+        if not subsets[i - 1] & ~others:
+            kept.remove(i)
+    return kept
+
+
+def greedy_completion(uncovered, instance):
+    '''
+    The greedy of initial_upper_bound restricted to the elements of uncovered, with the lazy inverted-index scheme
+    of greedy_set_cover: gains are only counted for subsets containing an uncovered element and are decremented
+    through instance.covering, so a completion costs O(sum of the degrees of the uncovered elements + picks * log m)
+    instead of a rescan of every subset for every pick. Picks the same subsets as initial_upper_bound.
+    :param uncovered: bitmask of the elements to cover
+    :return: (cost, 1-based subset indices), (inf, []) if some element is in no subset
+    '''
+    pending = set(elements_of(uncovered))
+    gains = {}
+    for e in pending:
+        for i in instance.covering(e):
+            gains[i] = gains.get(i, 0) + 1
+    heap = [(-gain, i) for i, gain in gains.items()]
+    heapq.heapify(heap)
+    selected = []
+    while pending:
+        if not heap:
+            return float('inf'), []
+        neg_gain, i = heapq.heappop(heap)
+        if -neg_gain != gains[i]:
+            heapq.heappush(heap, (-gains[i], i))  # stale entry, re-queue with its current gain
+            continue
+        selected.append(i + 1)
+        for e in instance.elements(i):
+            if e in pending:
+                pending.remove(e)
+                for j in instance.covering(e):
+                    gains[j] -= 1
+    return len(selected), selected
+
 
-def fractional_lower_bound(uncovered, subsets):
+def primal_dive(node, instance):
     '''
-    Calculate the lower_bound in each node. The LB = current_count + lb with/without Si in set cover.
-    :param uncovered: uncovered is the difference set between U and subset Si
-    :param subsets: remaining subsets
-    :return: return the lower_bound for each node
+    Primal heuristic: complete an open node with greedy_completion, then remove redundant subsets.
+    Any subset may be used, the cover is only needed as an incumbent.
+    :return: (cost, 1-based subset indices) or None if the node cannot be completed
     '''
-    uncovered = set(uncovered)
-    sets = [s & uncovered for s in subsets if s & uncovered]
-    count = 0.0
+    cost, completion = greedy_completion(node.uncovered, instance)
+    if cost == float('inf'):
+        return None
+    selected = remove_redundant(selected_subsets(node.chain) + completion, instance.masks)
+    return len(selected), selected
 
-    #best = max(sets, key=lambda s: len(s), default=None)
-    #count = len(uncovered) / len(best)
 
 
-    while uncovered:
-        # Pick the set covering the most uncovered elements
+class Node:
+    '''
+    Node of the search tree. Nodes are ordered by estimated total count, then by current count and index.
+    The chosen subsets are not copied into every node: chain is a parent-pointer chain of (parent chain, subset)
+    links ending in None or a flat list, materialised by selected_subsets() only when needed.
+    '''
+
+    __slots__ = ('est', 'count', 'index', 'uncovered', 'chain', 'used', 'warm', 'excluded')
+
+    def __init__(self, est, count, index, uncovered, chain, used, warm, excluded):
+        self.est = est              # total_estimated_count
+        self.count = count          # current_count
+        self.index = index          # next subset to branch on
+        self.uncovered = uncovered  # bitmask of uncovered elements
+        self.chain = chain          # selected subsets (1-based), see selected_subsets
+        self.used = used            # subsets used by the node's lower bound
+        self.warm = warm            # bound engine warm start
+        self.excluded = excluded    # subsets fixed out of the subtree
+
+    def __lt__(self, other):
+        return (self.est, self.count, self.index) < (other.est, other.count, other.index)
+
+    def nbytes(self):
+        '''Approximate memory held by the node, used for the memory budget.'''
+        size = sys.getsizeof(self) + sys.getsizeof(self.uncovered) + sys.getsizeof(self.used) \
+            + sys.getsizeof(self.excluded) + 64  # 64: the chain link
+        return size + (self.warm.nbytes if self.warm is not None else 0)
+
+
+def selected_subsets(chain):
+    '''Materialise a chain of (parent, subset) links into the list of selected subsets.'''
+    tail = []
+    while isinstance(chain, tuple):
+        chain, subset = chain
+        tail.append(subset)
+    return (chain or []) + tail[::-1]
+
+
+def build_bound_engine(bound, instance, stats, tiered=True):
+    '''
+    Bound engine used by the search, timed into stats.
+    :param bound: name of the lower bound engine in bnb_bounds.BOUNDS
+    :param tiered: try the cheap bounds of bnb_bounds.TieredBound before the requested one
+    '''
+    engine = TieredBound(instance, bound, stats) if tiered else make_bound(bound, instance)
+    return TimedBound(engine, stats)
+
+
+def root_node(instance, bound_engine, best_cost):
+    '''Build the root of the search tree.'''
+    lb, used, warm, fixed = bound_engine.bound(instance.universe_mask, 0, 0, None, best_cost)
+    return Node(lb, 0, 0, instance.universe_mask, None, used, warm, fixed)
+
 
-        greedy_set = None
-        max_size = 0
+def child_bound(table, bound_engine, uncovered, start, count, excluded, warm, budget, known=None):
+    '''
+    Bound of a child state, through the transposition table if there is one.
+    :return: (lb, used, warm, fixed), None if the table holds a state dominating the child
+    '''
+    if table is not None:
+        return table.bound(bound_engine, uncovered, start, count, excluded, warm, budget, known)
+    return known if known is not None else bound_engine.bound(uncovered, start, excluded, warm, budget)
+
+
+def expand_node(node, instance, bound_engine, best_cost, table=None):
+    '''
+    Branch on the next free subset of a non-leaf node: include it or exclude it.
+    :param node: Node
+    :param instance: SetCoverInstance being searched
+    :param bound_engine: lower bound engine from bnb_bounds
+    :param best_cost: current upper bound
+    :param table: TranspositionTable dropping dominated children, None to disable
+    :return: the children whose estimated count is below best_cost
+    '''
+    subsets = instance.masks
+    current_count, index, uncovered, used, warm, excluded = \
+        node.count, node.index, node.uncovered, node.used, node.warm, node.excluded
+    children = []
+
+    while index < len(subsets) and (excluded >> index) & 1:  # subsets fixed out by the bound are skipped
+        index += 1
+
+    if index >= len(subsets) or current_count >= best_cost: # Check the condition where no set cover exists
+        return children
+
+    # Include subset[index]
+    new_uncovered = uncovered & ~subsets[index]
+    result = child_bound(table, bound_engine, new_uncovered, index + 1, current_count + 1, excluded, warm,
+                         best_cost - current_count - 1)
+    if result is not None:
+        lb, child_used, child_warm, fixed = result
+        est_cost = current_count + 1 + lb
+        if est_cost < best_cost:
+            children.append(Node(est_cost, current_count + 1, index + 1, new_uncovered, (node.chain, index + 1),
+                                 child_used, child_warm, excluded | fixed))
+
+    # Exclude subset[index]. If the node's own bound did not use subset[index], the bound is the same without it
+    # and carries over unchanged.
+    known = None if (used >> index) & 1 else (node.est - current_count, used, warm, 0)
+    result = child_bound(table, bound_engine, uncovered, index + 1, current_count, excluded, warm,
+                         best_cost - current_count, known)
+    if result is not None:
+        lb, child_used, child_warm, fixed = result
+        est_cost = current_count + lb
+        if est_cost < best_cost:
+            children.append(Node(est_cost, current_count, index + 1, uncovered, node.chain,
+                                 child_used, child_warm, excluded | fixed))
+    return children
+
+
+def expand_node_by_element(node, instance, bound_engine, best_cost, table=None):
+    '''
+    Branch on the uncovered element with the fewest free covering subsets c_1..c_r: child k includes c_k and
+    excludes c_1..c_(k-1), so every cover is reached exactly once. The covering subsets are tried in order of
+    decreasing residual coverage.
+    :param node: Node, its index only marks subsets[:index] as decided
+    :param instance: SetCoverInstance being searched
+    :param bound_engine: lower bound engine from bnb_bounds
+    :param best_cost: current upper bound
+    :param table: TranspositionTable dropping dominated children, None to disable
+    :return: the children whose estimated count is below best_cost
+    '''
+    subsets = instance.masks
+    current_count, index, uncovered, excluded = node.count, node.index, node.uncovered, node.excluded
+    children = []
+    if current_count + 1 >= best_cost:
+        return children
+
+    branch = None
+    for e in elements_of(uncovered):
+        free = [j for j in instance.covering(e) if j >= index and not (excluded >> j) & 1]
+        if branch is None or len(free) < len(branch):
+            branch = free
+            if len(branch) <= 1:
+                break
+    if not branch:
+        return children  # an uncovered element can no longer be covered
+    branch.sort(key=lambda j: -(subsets[j] & uncovered).bit_count())
+
+    for j in branch:
+        new_uncovered = uncovered & ~subsets[j]
+        result = child_bound(table, bound_engine, new_uncovered, index, current_count + 1, excluded, node.warm,
+                             best_cost - current_count - 1)
+        if result is None:
+            excluded |= 1 << j
+            continue
+        lb, child_used, child_warm, fixed = result
+        est_cost = current_count + 1 + lb
+        if est_cost < best_cost:
+            children.append(Node(est_cost, current_count + 1, index, new_uncovered, (node.chain, j + 1),
+                                 child_used, child_warm, excluded | fixed))
+        excluded |= 1 << j
+    return children
 
-        for s in sets:  # Greedily find the subset containing most uncovered elements of universe-best_set
-            if len(s) > max_size:
-                max_size = len(s)
-                greedy_set = s
 
-        if not greedy_set:
-            return float('inf')  # No set cover exists
-        covered = len(greedy_set)
-        count += 1.0 / covered  # Add a fraction to count as low-bound
-        uncovered -= greedy_set
-        sets = [s & uncovered for s in subsets if s & uncovered]
+BRANCHING = {
+    'index': expand_node,
+    'element': expand_node_by_element,
+}
 
 
-    return count
+def offer_incumbent(control, reduction, best_res):
+    '''Publish an incumbent of the (kernel) search to a SolverControl, in the numbering of the original instance.'''
+    if best_res[0] == float('inf'):
+        return
+    if reduction is not None:
+        best_res = reduction.lift(best_res, [])[0]
+    control.offer(*best_res)
 
 
-def branch_and_bound(universe, subsets, cutoff_time):
+def branch_and_bound(instance, cutoff_time, bound='fractional', memory_budget=None, reduce=True, branching='index',
+                     checkpoint=None, checkpoint_interval=60, resume=None, stats=None, telemetry=None,
+                     telemetry_interval=5, table_size=2 ** 16, dive_every=1000, incumbent=None, tiered=True,
+                     control=None):
     '''
     Implement the branch_and_bound algorithm with initial upper bound and iteratively updated low bound. Prune some
     some branches if their low bound is bigger than current upper bound.
+    The search runs on the kernel left by the reductions of bnb_reduction.py, the result is mapped back to the
+    original subset numbering. Nodes are expanded best-first. Once the priority queue would exceed memory_budget,
+    children are explored depth-first from a stack instead, so the queue stops growing until it has shrunk below the
+    budget again.
+    The open nodes, incumbent and trace_log can be written to a checkpoint every checkpoint_interval seconds and when
+    the cutoff is reached. A run resumed from a checkpoint continues its clock, so cutoff_time is the total budget.
+    :param instance: SetCoverInstance, uncovered elements are tracked as a bitmask over instance.masks
+    :param cutoff_time: cutoff time in seconds
+    :param bound: name of the lower bound engine in bnb_bounds.BOUNDS ('fractional' or 'lagrangian')
+    :param memory_budget: approximate memory allowed for the priority queue in MB, None for no limit
+    :param reduce: run the reduction pre-pass
+    :param branching: 'index' branches include/exclude on subsets in input order, 'element' branches over the covers
+                      of the most constrained uncovered element (see BRANCHING)
+    :param checkpoint: file to write checkpoints to, None to disable
+    :param checkpoint_interval: seconds between two checkpoints
+    :param resume: checkpoint file to resume the search from
+    :param stats: SearchStats filled in during the search, None to keep them internal
+    :param telemetry: text stream receiving the statistics as JSON lines every telemetry_interval seconds
+    :param telemetry_interval: seconds between two telemetry lines
+    :param table_size: entries of the transposition table dropping repeated subproblems, 0 to disable
+    :param dive_every: run primal_dive on the most promising open node every dive_every nodes, 0 to disable
+    :param incumbent: (cost, 1-based subset indices) of a known cover, e.g. from read_incumbent_file. It replaces the
+                      greedy upper bound if it is better
+    :param tiered: try cheap bounds first and only compute the requested bound when they do not prune
+    :param control: SolverControl whose deadline / cancellation stops the search and which receives every incumbent,
+                    None for a control expiring cutoff_time after the (resumed) start. A given control is moved back
+                    by the elapsed time of a resumed checkpoint
     '''
 
     start_time = time.time()  # start counting the time
+    stats = stats if stats is not None else SearchStats()
+    reduction = reduce_instance(instance) if reduce else None
+    if reduction is not None:
+        instance = reduction.kernel
+        stats.cost_offset = len(reduction.forced)
+    universe, subsets = instance.universe_mask, instance.masks
     #trace_log = []
 
     queue = []
+    stack = []  # depth-first nodes, used while the queue is over budget
     # initial_UB = initial_upper_bound(universe, subsets)
     # best_res = (initial_UB, [])
     best_cost, best_subsets = initial_upper_bound(universe, subsets)  # Initial upper bound
+    if incumbent is not None:
+        known = reduction.project(incumbent[1]) if reduction is not None else incumbent[1]
+        if len(known) < best_cost:
+            best_cost, best_subsets = len(known), known
     best_res = (best_cost, best_subsets)
     trace_log = [(0.00, best_cost)]
     #best_res = (float('inf'), [])  # record the number and subsets of set cover
 
-    # Create a priority queue for (total_estimated_count, current_count, index, uncovered, selected subsets)
-    heapq.heappush(queue, (0, 0, 0, universe, []))
-
-    while queue:
+    bound_engine = build_bound_engine(bound, instance, stats, tiered)
+    expand = BRANCHING[branching]
+    table = TranspositionTable(table_size, stats) if table_size else None
+    settings = {'bound': bound, 'branching': branching, 'reduce': reduce}
+
+    if resume is not None:
+        queue, stack, best_res, trace_log, elapsed = load_checkpoint(resume, instance, settings, Node)
+        start_time = time.time() - elapsed
+    else:
+        # Create a priority queue of nodes ordered by total_estimated_count
+        heapq.heappush(queue, root_node(instance, bound_engine, best_cost))
+    if control is None:
+        control = SolverControl(cutoff_time, start_time)
+    elif resume is not None:
+        control.resume(elapsed)
+    offer_incumbent(control, reduction, best_res)
+    sample = queue[0] if queue else stack[-1] if stack else None
+    max_queue = float('inf') if memory_budget is None or sample is None \
+        else max(1, int(memory_budget * 2 ** 20 // sample.nbytes()))
+    last_checkpoint = last_report = time.time()
+
+    while queue or stack:
 
         now = time.time()
         elapsed = now - start_time
 
-        est_total, current_count, index, uncovered, selected = heapq.heappop(queue)
-
-        #stop if out of time
-        if elapsed > cutoff_time:
+        #stop if out of time or cancelled
+        if control.expired():
             break
 
-        if not uncovered:   # leaf node check
-            if current_count < best_res[0]:  # update results if new result is less than recorded best result （best_res)
-                best_res = (current_count, selected)
-                trace_log.append((elapsed, current_count))  # record new best
+        if checkpoint is not None and now - last_checkpoint >= checkpoint_interval:
+            save_checkpoint(checkpoint, instance, settings, queue, stack, best_res, trace_log, elapsed,
+                            selected_subsets)
+            last_checkpoint = now
+
+        if telemetry is not None and now - last_report >= telemetry_interval:
+            stats.update(elapsed, best_res[0], queue, stack)
+            stats.emit(telemetry)
+            last_report = now
+
+        # no dive at node 0, the root was completed by initial_upper_bound already
+        if dive_every and stats.nodes_popped and stats.nodes_popped % dive_every == 0 and not control.expired():
+            dive = primal_dive(stack[-1] if stack else queue[0], instance)
+            if dive is not None and dive[0] < best_res[0]:
+                best_res = dive
+                trace_log.append((elapsed, dive[0]))
+                stats.dive_improvements += 1
+                offer_incumbent(control, reduction, best_res)
+
+        node = stack.pop() if stack else heapq.heappop(queue)
+        stats.nodes_popped += 1
+
+        if not node.uncovered:   # leaf node check
+            if node.count < best_res[0]:  # update results if new result is less than recorded best result （best_res)
+                best_res = (node.count, selected_subsets(node.chain))
+                trace_log.append((elapsed, node.count))  # record new best
+                offer_incumbent(control, reduction, best_res)
             continue
 
-        if index >= len(subsets) or current_count >= best_res[0]: # Check the condition where no set cover exists
+        if node.est >= best_res[0]:  # the incumbent improved since the node was pushed
+            stats.pruned_by_bound += 1
             continue
 
-        # Include subset[index]
-        new_uncovered = uncovered - subsets[index]
-        lb = fractional_lower_bound(new_uncovered, subsets[index + 1:])
-        est_cost = current_count + 1 + lb
-        if est_cost < best_res[0]:
-            heapq.heappush(queue, (est_cost, current_count + 1, index + 1, new_uncovered, selected + [index+1]))
-
-        # Exclude subset[index]
-        lb = fractional_lower_bound(uncovered, subsets[index + 1:])
-        est_cost = current_count + lb
-        if est_cost < best_res[0]:
-            heapq.heappush(queue, (est_cost, current_count, index + 1, uncovered, selected))
-
+        children = expand(node, instance, bound_engine, best_res[0], table)
+        stats.nodes_pushed += len(children)
+        if stack or len(queue) + len(children) > max_queue:
+            stack.extend(sorted(children, reverse=True))  # most promising child on top of the stack
+        else:
+            for child in children:
+                heapq.heappush(queue, child)
+        stats.max_frontier = max(stats.max_frontier, len(queue) + len(stack))
+
+    stats.update(time.time() - start_time, best_res[0], queue, stack)
+    if telemetry is not None:
+        stats.emit(telemetry)
+    if checkpoint is not None:
+        save_checkpoint(checkpoint, instance, settings, queue, stack, best_res, trace_log, stats.elapsed,
+                        selected_subsets)
+    if reduction is not None:
+        best_res, trace_log = reduction.lift(best_res, trace_log)
     return best_res, trace_log
 
 
 def parse_input_file(filepath):
-    with open(filepath, 'r') as f:
-        lines = f.readlines()
-
-    n, m = map(int, lines[0].split())
-    U = set(range(1, n + 1))
-    S = []
+    return load_instance(filepath)
 
-    for line in lines[1:1 + m]:
-        parts = list(map(int, line.split()))
-        subset = set(parts[1:])  # Skip the first number (subset size)
-        S.append(subset)
 
-    return U, S
 
+def read_incumbent_file(filepath, instance):
+    '''
+    Read a .sol file (cost, then 1-based subset indices) and check it against the instance.
+    :return: (cost, sorted 1-based subset indices)
+    :raise ValueError: if the file is malformed or does not describe a cover of the instance
+    '''
+    with open(filepath) as f:
+        lines = f.read().split('\n')
+    try:
+        cost = int(lines[0])
+        selected = sorted(set(int(i) for i in lines[1].split()))
+    except (ValueError, IndexError):
+        raise ValueError(f"{filepath} is not a solution file")
+    if any(i < 1 or i > instance.m for i in selected):
+        raise ValueError(f"{filepath} uses subsets outside 1..{instance.m}")
+    if not instance.covers([i - 1 for i in selected]):
+        raise ValueError(f"{filepath} does not cover every element")
+    if cost != len(selected):
+        raise ValueError(f"{filepath} reports cost {cost} for {len(selected)} subsets")
+    return cost, selected
+
+
+INCUMBENT_DIRS = ['.', 'Result_LS1', 'LocalSearch1/Result_LS1', 'Result_LS3', 'Result', 'LocalSearch2/Result']
+
+
+def find_incumbent_file(instance, instance_name, dirs=INCUMBENT_DIRS):
+    '''
+    Find the cheapest valid .sol file written for an instance by any algorithm (<instance>_<alg>_..._.sol).
+    :param instance_name: file name of the instance, with or without its .in extension
+    :return: (path, (cost, 1-based subset indices)) or None if there is no valid file
+    '''
+    stem = instance_name[:-3] if instance_name.endswith('.in') else instance_name
+    best = None
+    for directory in dirs:
+        for prefix in {stem, instance_name}:
+            for path in glob.glob(os.path.join(directory, glob.escape(prefix) + '_*.sol')):
+                try:
+                    solution = read_incumbent_file(path, instance)
+                except ValueError:
+                    continue
+                if best is None or solution[0] < best[1][0]:
+                    best = (path, solution)
+    return best
 
 
 def write_BnB_solution_file(instance_name, cutoff, best_solution):
@@ -159,16 +481,22 @@ def write_BnB_trace_file(instance_name, cutoff, trace_log):
         for timestamp, quality in trace_log:
             f.write(f"{timestamp:.6f} {quality}\n")
 
+def write_BnB_stats_file(instance_name, cutoff, stats):
+    filename = f"{instance_name}_BnB_{cutoff}.stats.json"
+    with open(filename, 'w') as f:
+        json.dump(stats.snapshot(), f, indent=2)
+        f.write('\n')
+
 
 if __name__ == "__main__":
     cutoff_time = 1200
     for filename in os.listdir("data1"):
         if filename.endswith(".in"):
             instance_name = filename.split('.')[0]  # remove extension
-            U, S = parse_input_file(f'data/{filename}')
+            instance = parse_input_file(f'data/{filename}')
 
-            #U, S = parse_input_file('data/large9.in')
-            best_solution, trace_log = branch_and_bound(U, S, cutoff_time )
+            #instance = parse_input_file('data/large9.in')
+            best_solution, trace_log = branch_and_bound(instance, cutoff_time)
             #print(best_solution)
 
             write_BnB_solution_file(instance_name, cutoff_time, best_solution)
@@ -1,47 +1,61 @@
 import os
+import sys
 import time
+import heapq
 import random
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from set_cover_instance import load_instance
+from solver_control import SolverControl
+
 def parse_set_cover_instance(filename):
-    subsets = []
-    universe_size = 0
     try:
-        with open(filename, 'r') as f:
-            line1 = f.readline().strip().split()
-            universe_size = int(line1[0])
-            num_subsets = int(line1[1])
-            for _ in range(num_subsets):
-                line = f.readline().strip().split()
-                elements = set(map(int, line[1:]))
-                subsets.append(elements)
-        return universe_size, subsets
+        return load_instance(filename)
     except Exception as e:
         print(f"Error parsing {filename}: {e}")
-        return None, None
+        return None
 
-def greedy_set_cover(universe_size, subsets):
-    uncovered = set(range(1, universe_size + 1))
+def greedy_set_cover(instance, control=None):
+    """
+    Lazy greedy with an element -> subset inverted index.
+    gains[i] is the number of uncovered elements of subset i. When a subset is picked, only the
+    subsets covering its newly covered elements are decremented, so the whole run costs
+    O(total input size + picks * log m).
+    The heap keeps one (-gain, index) entry per subset whose stored gain may be stale (never below
+    the real gain). A popped entry is re-pushed with its current gain until it is up to date, so the
+    subset picked is the first (smallest index) one with maximum gain, same as a full rescan.
+    The cover is offered to control (see solver_control.py) if one is given. The greedy has no partial
+    cover to return, so it does not poll the deadline.
+    """
+    m = instance.m
+    gains = [instance.size(i) for i in range(m)]
+    heap = [(-g, i) for i, g in enumerate(gains)]
+    heapq.heapify(heap)
+    covered = bytearray(instance.n + 1)
+    num_uncovered = instance.n
     cover_indices = []
-    remaining = [(i + 1, s.copy()) for i, s in enumerate(subsets)]
-
-    while uncovered and remaining:
-        best_idx, best_set, best_i = -1, set(), -1
-        max_covered = -1
-
-        for i, (idx, subset) in enumerate(remaining):
-            covered = subset & uncovered
-            if len(covered) > max_covered:
-                best_idx, best_set, best_i = idx, covered, i
-                max_covered = len(covered)
 
-        if max_covered <= 0:
+    while num_uncovered and heap:
+        neg_gain, i = heapq.heappop(heap)
+        if -neg_gain != gains[i]:
+            heapq.heappush(heap, (-gains[i], i))  # stale entry, re-queue with its current gain
+            continue
+        if gains[i] <= 0:
             break
 
-        cover_indices.append(best_idx)
-        uncovered -= best_set
-        remaining.pop(best_i)
+        cover_indices.append(i + 1)
+        for e in instance.elements(i):
+            if not covered[e]:
+                covered[e] = 1
+                num_uncovered -= 1
+                for j in instance.covering(e):
+                    gains[j] -= 1
 
-    return sorted(cover_indices)
+    cover_indices.sort()
+    if control is not None and not num_uncovered:
+        control.offer(len(cover_indices), cover_indices)
+    return cover_indices
 
 def write_approx_solution_file(inst_name, method, cutoff, cover_indices):
     base = inst_name.replace('.in', '')
@@ -56,19 +70,20 @@ def write_approx_solution_file(inst_name, method, cutoff, cover_indices):
     except Exception as e:
         print(f"Error writing solution: {e}")
 
-def run_greedy(inst_name, cutoff, seed):
+def run_greedy(inst_name, cutoff, seed, control=None):
     random.seed(seed)
+    control = control if control is not None else SolverControl(cutoff)
     instance_path = os.path.join("data", inst_name)
 
-    universe_size, subsets = parse_set_cover_instance(instance_path)
-    if universe_size is None:
+    instance = parse_set_cover_instance(instance_path)
+    if instance is None:
         return
 
     start_time = time.time()
-    cover_indices = greedy_set_cover(universe_size, subsets)
+    cover_indices = greedy_set_cover(instance, control)
     elapsed = time.time() - start_time
 
-    if elapsed > cutoff:
+    if control.expired():
         print(f"Warning: Execution time {elapsed:.2f}s exceeded cutoff {cutoff}s")
 
     write_approx_solution_file(inst_name, "Approx", cutoff, cover_indices)
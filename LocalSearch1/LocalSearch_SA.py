@@ -10,89 +10,36 @@
 
 import numpy as np
 import random
-import heapq
 import os
+import sys
 import time
 import concurrent.futures
+import multiprocessing
+import signal
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from set_cover_instance import load_instance
+from solver_control import SolverControl, as_completed
 
 
 def read_data(file_path):
     """
-    Reads data from a specified file and returns it as a list of lines.
+    Reads a set cover instance from a specified file.
     Parameters:
         file_path (str): Path to the file to be read.
     Returns:
-        list[str]: List of stripped lines from the file.
+        SetCoverInstance: subsets as bitmasks (instance.masks) and CSR arrays, subset k is
+                          written as k + 1 in the output. None if the file does not exist.
     """
     try:
-        with open(file_path, 'r') as file:
-            data = file.readlines()
-        return [line.strip() for line in data if line.strip()]
+        return load_instance(file_path)
     except FileNotFoundError:
         print(f"Error: File not found at {file_path}")
-        return []
-
-
-def parse_data(lines):
-    """
-    Parses a set cover input format from lines and returns:
-    - number of items (n)
-    - number of subsets (m)
-    - dict of subsets (each subset is a set of integers)
-    Parameters:
-        lines (list[str]): Lines from the input file.
-    Returns:
-        n, m, list of sets
-    """
-    # Parse first line
-    [n, m] = list(map(int, lines[0].split()))
-    # Parse subsets
-    subsets = {}
-    for idx, line in enumerate(lines[1:1 + m], 1):
-        info = list(map(int, line.split()))
-        num = info[0]
-        subset_items = set(info[1:])
-        subsets[idx]=(subset_items)
-    return n, m, subsets
+        return None
 
 
 
-def f_value(S,current_items):
-    """
-    Computes the f value of a solution based on the number of items covered.
-    Parameters:
-        m (int): Total number of subsets.
-        subsets list: selected subsets.
-    Returns:
-        int: f value.
-    """
-    # Initialize f_value，with the length of subsets
-    f=len(S)
-    # Regularize on the redundancy and disappear items
-    for i in current_items:
-        if current_items[i]>1:
-            f+=10*current_items[i]
-        elif current_items[i]==0:
-            f+=100
-    return f
-
-
-def check_cover(current_items):
-    """
-    Check if the selected subsets cover all items.
-    Parameters:
-        n (int): Number of items.
-        subsets list: selected subsets.
-    Returns:
-        bool: True if all items are covered, False otherwise.
-        int: uncovered items
-    """
-    for i in current_items:
-        if current_items[i]<1:
-            return False
-    return True
-    
 def probability(f1, f2, T):
     """
     Computes the probability of accepting a worse solution.
@@ -120,181 +67,332 @@ def Temperature(T,T1,alpha=0.99):
     """
     return T * alpha
 
-def tmp_process_smarter(subsets,S,O,current_items,item_address):
+def penalty(count):
     """
-    Process the subsets to get the information for the temporary solution
-    Parameters:
-        subsets (dict) : All the subset and stored information
-        S ([int]) : Selected subset index
-        O ([int]) : Not selected subset index
-        current_items : Item frequency in S
-        item_address : backtrace the location of a certain item
-    Returns:
-        uncovered_items (int): Number of uncovered items.
+    Contribution of one item with the given frequency to the f value.
     """
-    tmp_S, tmp_O, tmp_current_items = smart_neighbor(S,O,subsets,current_items,item_address)
-    cover = check_cover(tmp_current_items)
-    f = f_value(tmp_S,tmp_current_items)
-    return cover,tmp_S, tmp_O, tmp_current_items, f
+    if count > 1:
+        return 10 * count
+    if count == 0:
+        return 100
+    return 0
 
-def smart_neighbor(S, O, subsets, current_items, item_address):
+
+class MoveEngine:
     """
-    Using a smarter nerghbor strategy, sort and pop the most redundancy and the absent item,
-    and add a random selected list indeces
-    Parameters:
+    SA state changed in place: the selected subsets, the item frequencies, the f value and the number of uncovered
+    items. score() evaluates candidate flips without changing the state, and flip() applies the accepted one,
+    updating f and the uncovered count from the items of the flipped subset only, so a move costs O(|subset|).
+    Items are kept in buckets indexed by their frequency (bucket_pos[item] is the item's slot in its bucket), so
+    the most redundant item and an uncovered item are found in O(1). S and O are unordered lists with position[k]
+    the slot of subset k in the one holding it, and selected[k] tells which one that is.
+    Only items contained in some subset take part in the f value, like the item dictionary it replaces.
+    Attributes:
         S ([int]) : Selected subset index
         O ([int]) : Not selected subset index
-        subsets (dict) : All the subset and stored information
-        current_items : Item frequency in S
-        item_address : backtrace the location of a certain item
+        current_items ([int]) : current_items[item] is the item frequency in S
+        f (int) : len(S) + sum of penalty(frequency) over the items
+        uncovered (int) : Number of items with frequency 0
     """
-    heap_descending = []
-    heap_ascending = []
+    batch = 1  # neighbors drawn and scored together by ls_sa
 
-    for i in current_items:
-        heapq.heappush(heap_ascending, (current_items[i], i))
-        heapq.heappush(heap_descending, (-current_items[i], i))
+    def __init__(self, instance, S):
+        self._init_subsets(instance)
+        self.current_items = [0] * (instance.n + 1)
+        items = [e for e in range(1, instance.n + 1) if len(instance.covering(e))]
+        self.buckets = [items, [], []]
+        self.bucket_pos = [0] * (instance.n + 1)
+        for k, e in enumerate(items):
+            self.bucket_pos[e] = k
+        self.top = 0  # no bucket above top holds an item
+        self.f = penalty(0) * len(items)
+        self.uncovered = len(items)
+        for k in S:
+            self.flip(k)
 
-    neighborhood = random.sample(S + O, min(len(S+O),10))
+    def _init_subsets(self, instance):
+        m = instance.m
+        self.instance = instance
+        self.selected = bytearray(m)
+        self.S = []
+        self.O = list(range(m))
+        self.position = list(range(m))
 
-    # Redundant: pop those that appear > 1 time
-    redundancy = heapq.heappop(heap_descending)
-    if redundancy[0] < -1:
-        idx = redundancy[1]
-        for i in item_address[idx]:
-            if i in S:
-                neighborhood.append(i)
-                    
+    def _move(self, select, source, target):
+        k = self.position[select]
+        last = source.pop()
+        if last != select:
+            source[k] = last
+            self.position[last] = k
+        self.position[select] = len(target)
+        target.append(select)
 
-    # Lack: item not covered
-    lack = heapq.heappop(heap_ascending)
-    if lack[0] == 0:
-        neighborhood=[]
-        idx = lack[1]
-        for i in item_address[idx]:
-            if i in O:
-                neighborhood.append(i)
-    # Fallback if neighborhood is empty
-    if not neighborhood:
-        neighborhood = S + O
+    def _rebucket(self, item, count, new_count):
+        buckets, bucket_pos = self.buckets, self.bucket_pos
+        bucket = buckets[count]
+        k = bucket_pos[item]
+        last = bucket.pop()
+        if last != item:
+            bucket[k] = last
+            bucket_pos[last] = k
+        if new_count == len(buckets):
+            buckets.append([])
+        bucket_pos[item] = len(buckets[new_count])
+        buckets[new_count].append(item)
+        if new_count > self.top:
+            self.top = new_count
 
-    select = random.choice(neighborhood)
+    def flip(self, select):
+        """
+        Move subset select from S to O or from O to S.
+        """
+        if self.selected[select]:
+            self._move(select, self.S, self.O)
+            step = -1
+        else:
+            self._move(select, self.O, self.S)
+            step = 1
+        self.selected[select] ^= 1
+        self._update_items(select, step)
 
-    tmp_S = S.copy()
-    tmp_O = O.copy()
-    tmp_current_items = current_items.copy()
+    def _update_items(self, select, step):
+        current_items = self.current_items
+        f = self.f + step
+        uncovered = self.uncovered
+        for i in self.instance.elements(select):
+            count = current_items[i]
+            new_count = count + step
+            current_items[i] = new_count
+            f += penalty(new_count) - penalty(count)
+            uncovered += (new_count == 0) - (count == 0)
+            self._rebucket(i, count, new_count)
+        self.f = f
+        self.uncovered = uncovered
+
+    def score(self, candidates):
+        """
+        f values after flipping each candidate, every one from the current solution. The state is not changed.
+        """
+        current_items = self.current_items
+        scores = []
+        for select in candidates:
+            step = -1 if self.selected[select] else 1
+            f = self.f + step
+            for i in self.instance.elements(select):
+                count = current_items[i]
+                f += penalty(count + step) - penalty(count)
+            scores.append(f)
+        return scores
+
+    def reset(self, S):
+        """
+        Go back to the solution S, flipping only the subsets that differ.
+        """
+        target = bytearray(len(self.selected))
+        for k in S:
+            target[k] = 1
+        for k in [k for k in self.S if not target[k]] + [k for k in S if not self.selected[k]]:
+            self.flip(k)
+
+    def most_redundant(self):
+        """
+        An item covered more than once, with the highest frequency. None if there is none.
+        """
+        while self.top > 1 and not self.buckets[self.top]:
+            self.top -= 1
+        return self.buckets[self.top][-1] if self.top > 1 else None
+
+    def any_uncovered(self):
+        """
+        An item that is not covered, None if S is a cover.
+        """
+        return self.buckets[0][-1] if self.buckets[0] else None
+
+    def cover(self):
+        """
+        True if the selected subsets cover all items.
+        """
+        return self.uncovered == 0
+
+
+class NumpyMoveEngine(MoveEngine):
+    """
+    Vectorized MoveEngine: the item frequencies are an int32 array and the subsets are read from the CSR arrays
+    of the instance (instance.covering is the transposed CSR). A flip updates the frequencies of the subset's items
+    with one fancy-indexing operation, and score() evaluates a batch of candidate flips at once with a segmented sum.
+    The most redundant / an uncovered item are found with argmax over the frequencies. S, O and selected are kept
+    like in MoveEngine.
+    """
+    batch = 10
+
+    def __init__(self, instance, S):
+        self._init_subsets(instance)
+        self.offsets = np.asarray(instance.offsets, dtype=np.int64)
+        self.indices = np.asarray(instance.indices, dtype=np.int64)
+        self.current_items = np.zeros(instance.n + 1, dtype=np.int32)
+        # items contained in no subset are left out of f, like in MoveEngine
+        self.present = np.bincount(self.indices, minlength=instance.n + 1) > 0
+        self.f = penalty(0) * int(self.present.sum())
+        self.uncovered = int(self.present.sum())
+        for k in S:
+            self.flip(k)
+
+    @staticmethod
+    def _penalty(counts):
+        return np.where(counts > 1, 10 * counts, np.where(counts == 0, 100, 0))
+
+    def _update_items(self, select, step):
+        items = self.indices[self.offsets[select]:self.offsets[select + 1]]
+        counts = self.current_items[items]
+        new_counts = counts + step
+        self.current_items[items] = new_counts
+        self.f += step + int((self._penalty(new_counts) - self._penalty(counts)).sum())
+        self.uncovered += int(np.count_nonzero(new_counts == 0)) - int(np.count_nonzero(counts == 0))
+
+    def score(self, candidates):
+        candidates = np.asarray(candidates, dtype=np.int64)
+        steps = np.where(np.frombuffer(self.selected, dtype=np.uint8)[candidates] == 1, -1, 1)
+        starts = self.offsets[candidates]
+        lengths = self.offsets[candidates + 1] - starts
+        # CSR positions of all candidate items, segment k holds the items of candidates[k]
+        segment = np.repeat(np.arange(len(candidates)), lengths)
+        first = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - first, lengths) + np.arange(int(lengths.sum()))
+        counts = self.current_items[self.indices[positions]]
+        delta = self._penalty(counts + steps[segment]) - self._penalty(counts)
+        # segmented sum like np.add.reduceat, bincount also handles empty subsets
+        sums = np.bincount(segment, weights=delta, minlength=len(candidates))
+        return (self.f + steps + sums.astype(np.int64)).tolist()
+
+    def most_redundant(self):
+        top = int(np.argmax(self.current_items))
+        return top if self.current_items[top] > 1 else None
+
+    def any_uncovered(self):
+        if not self.uncovered:
+            return None
+        return int(np.argmax(self.present & (self.current_items == 0)))
+
+
+ENGINES = {
+    'python': MoveEngine,
+    'numpy': NumpyMoveEngine,
+}
 
-    if select in S:
-        tmp_S.remove(select)
-        tmp_O.append(select)
-        for i in subsets[select]:
-            if tmp_current_items[i]>1:
-                tmp_current_items[i] -= 1
-            else:
-                tmp_current_items[i]=0
-    else:
-        tmp_O.remove(select)
-        tmp_S.append(select)
-        for i in subsets[select]:
-            tmp_current_items[i] += 1
 
-    return tmp_S, tmp_O, tmp_current_items
+def smart_neighbor(engine):
+    """
+    Using a smarter nerghbor strategy, take the most redundancy and the absent item,
+    and add a random selected list indeces
+    Parameters:
+        engine (MoveEngine) : current solution, engine.instance.covering(item)
+                              backtraces the location of a certain item
+    Returns:
+        int: the subset to flip, see MoveEngine.flip
+    """
+    instance = engine.instance
+    neighborhood = random.sample(range(instance.m), min(instance.m, 10))
+
+    # Redundant: take one that appears the most times (> 1)
+    idx = engine.most_redundant()
+    if idx is not None:
+        neighborhood.extend(i for i in instance.covering(idx) if engine.selected[i])
 
+    # Lack: item not covered
+    idx = engine.any_uncovered()
+    if idx is not None:
+        neighborhood = [i for i in instance.covering(idx) if not engine.selected[i]]
+    # Fallback if neighborhood is empty
+    if not neighborhood:
+        neighborhood = range(instance.m)
 
-def greedy_initial_solution(n, subsets):
+    return random.choice(neighborhood)
+
+
+def greedy_initial_solution(instance):
     """
     Find a initial solution by greedily adding the subset with the most uncovered items
     Parameters:
-        n(int) : total number of items
-        subsets(dictionary) : subsets[i] represent the list of numbers stored in the i-th subset
+        instance(SetCoverInstance) : instance.masks[k] is the bitmask of the items stored in the k-th subset
     """
-    uncovered =  set(range(1, n + 1))
+    masks = instance.masks
+    uncovered = instance.universe_mask
     S = []
-    O = list(subsets.keys())
+    O = list(range(instance.m))
     while uncovered:
-        best_idx = max(subsets, key=lambda k: len(subsets[k] & uncovered))
+        best_idx = max(O, key=lambda k: (masks[k] & uncovered).bit_count())
         S.append(best_idx)
-        uncovered -= subsets[best_idx]
+        uncovered &= ~masks[best_idx]
         O.remove(best_idx)
     return S,O
 
-def ls_sa(m,n,subsets,T0=1000,alpha=0.99):
+def ls_sa(instance,T0=1000,alpha=0.99,backend='python',control=None):
     """
     Doing SA local search.
     Parameters:
-        m(int) : the total number of subsets
-        n(int) : the total number of items
-        subsets(dictionary) : subsets[i] represent the list of numbers stored in the i-th subset
+        instance(SetCoverInstance) : n items, m subsets, instance.elements(k) are the items stored in the k-th subset
         T0(int) : annealing temperature
         alpha(float) : decay rate
+        backend(str) : move engine in ENGINES, 'python' or 'numpy'
+        control(SolverControl) : stops the search at its deadline or when cancelled, and receives every
+                                 improved cover. None to stop on temperature only
+    Returns:
+        [int]: best cover found
+        dict: trace, seconds since control.start_time (since the call without control) -> cover size.
+              Runs sharing a start time are on one clock, see merge_traces
     """
-    start_time = time.time()
+    # seeds queued behind others in run_LS1_seeds must be timed from the run's start, not their own
+    start_time = control.start_time if control is not None else time.time()
     trace = {}
-    # Initialize the solution
-    item_address = {}
-    for i in subsets:
-        for j in subsets[i]:
-            if j in item_address.keys():
-                item_address[j].append(i)
-            else:
-                item_address[j]=[i]
+    n = instance.n
     # Greedily find a solution
-    S,O = greedy_initial_solution(n,subsets)  
+    S,O = greedy_initial_solution(instance)  
     # Give a random sublist to move away from local optimal  
     S=S+random.sample(O,min(len(O),int(np.sqrt(n))))
-    O = [x for x in O if x not in S]
-    # Create a dictionary to store the frequency of a certain item
-    current_items={}
-    for i in S:
-        for j in subsets[i]:
-            if j in current_items.keys():
-                current_items[j]+=1
-            else:
-                current_items[j]=1
-    for i in O:
-        for j in subsets[i]:
-            if j not in current_items.keys():
-                current_items[j]=0
+    # Item frequencies, f value and neighbor buckets are maintained by the move engine
+    engine = ENGINES[backend](instance, S)
     # Initiate the f value, temperature, best solution, best solution size
-    f_s=f_value(S,current_items)
+    f_s = engine.f
     T=T0
     best_S=S.copy()
-    best_O=O.copy()
-    best_items=current_items.copy()
     restart_count=1
     best_l = len(S)
     trace[time.time()-start_time]=best_l
+    if control is not None:
+        control.offer(best_l, sorted(k + 1 for k in best_S))
     i=0
     # Do local search
-    while T>5:
-        tmp_count = 1
+    while T>5 and not (control is not None and control.expired()):
+        tmp_count = 0
         i+=1
-        cover,tmp_S, tmp_O, tmp_current_items, f = tmp_process_smarter(subsets,S,O,current_items,item_address)
-        # Keep tracking the possibility of this solution, with maximum try of 10 to avoid dead lock
-        while (random.random()>probability(f_s,f,T)) and tmp_count<10:
+        # Keep tracking the possibility of the neighbors, with maximum try of 10 to avoid dead lock.
+        # Every neighbor is scored from the current solution, engine.batch of them at a time.
+        while True:
+            if tmp_count % engine.batch == 0:
+                candidates = [smart_neighbor(engine) for _ in range(engine.batch)]
+                scores = engine.score(candidates)
+            select, f = candidates[tmp_count % engine.batch], scores[tmp_count % engine.batch]
             tmp_count+=1
-            cover,tmp_S, tmp_O, tmp_current_items, f = tmp_process_smarter(subsets,S,O, current_items,item_address)
+            if random.random()<=probability(f_s,f,T) or tmp_count>=10:
+                break
+        engine.flip(select)
         # Update the solution
-        S = tmp_S
-        O = tmp_O
-        current_items=tmp_current_items
-        f_s = f
+        S = engine.S
+        f_s = engine.f
         T=Temperature(T,T0,alpha)
         # Update the optimal subsets
-        if cover:
+        if engine.cover():
             if len(S)<best_l:
                 trace_time = time.time()-start_time
                 best_S = S.copy()
-                best_O=O.copy()
-                best_items=current_items.copy()
                 best_l = len(S)
                 trace[trace_time] = best_l
+                if control is not None:
+                    control.offer(best_l, sorted(k + 1 for k in best_S))
         # Restart if it do not work better after 50 steps
         if len(S)>best_l:
             if restart_count==50:
-                S=best_S
-                O=best_O
-                current_items=best_items
+                engine.reset(best_S)
                 restart_count=1
             else:
                 restart_count+=1
@@ -307,7 +405,7 @@ def output_solution(S, instance, method, cutoff, randSeed):
     filename = f"Result_LS1/{instance}_{method}_{cutoff}_{randSeed}.sol"
     with open(filename, "w") as f:
         f.write(f"{quality}\n")
-        f.write(" ".join(map(str, S)) + "\n")
+        f.write(" ".join(str(i + 1) for i in S) + "\n")
     return 0
 
 def output_trace(trace, instance, method, cutoff, randSeed):
@@ -320,17 +418,114 @@ def output_trace(trace, instance, method, cutoff, randSeed):
     return 0
 
 
-def run_LS1(instance, cutoff, randSeed):
-    n,m, subsets = parse_data(read_data(f"data 2/{instance}"))
+_worker = {}
+
+
+def _init_worker(instance, cancel_event):
+    """
+    Process pool initializer of run_LS1_seeds. The instance is sent to every process once here, not pickled with
+    each seed. Ctrl-C is left to the parent, which sets cancel_event.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker['instance'] = instance
+    _worker['cancel_event'] = cancel_event
+
+
+def _seed_worker(randSeed, backend, cutoff, start_time):
+    """
+    seeded_ls_sa on the instance of the worker process, see _init_worker.
+    """
+    return seeded_ls_sa(_worker['instance'], randSeed, backend, cutoff, start_time)
+
+
+def seeded_ls_sa(instance, randSeed, backend='python', cutoff=None, start_time=None):
+    """
+    Run ls_sa with the random module seeded, so every seed of a parallel run explores differently
+    (forked workers would otherwise share the parent's random state).
+    Parameters:
+        cutoff (float) : seconds from start_time after which ls_sa returns its best solution, None for no limit
+        start_time (float) : time.time() at which the run started, default now
+    Returns:
+        ([int], dict): like ls_sa, ([], {}) if the run was over before this seed got a worker
+    """
+    random.seed(randSeed)
+    if cutoff is None:
+        return ls_sa(instance, backend=backend)
+    control = SolverControl(cutoff, start_time, _worker.get('cancel_event'))
+    if control.expired():
+        return [], {}
+    return ls_sa(instance, backend=backend, control=control)
+
+
+def merge_traces(traces):
+    """
+    Best-of trace of several runs: at every time the best quality any run had reached.
+    Parameters:
+        traces ([dict]) : time -> quality of each run, all timed from the same start_time
+    Returns:
+        dict: time -> quality, only the improvements
+    """
+    merged = {}
+    best = float('inf')
+    for t, quality in sorted((t, q) for trace in traces for t, q in trace.items()):
+        if quality < best:
+            best = quality
+            merged[t] = quality
+    return merged
 
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        future = executor.submit(ls_sa, m, n, subsets)
-        try:
-            best_S,trace = future.result(timeout=cutoff)
-        except concurrent.futures.TimeoutError:
-            print("Timed out!")
-            best_S,trace = None
+
+def run_LS1(instance, cutoff, randSeed, backend='python', control=None):
+    """
+    Run ls_sa once and write its .sol/.trace. ls_sa checks the deadline itself and returns the best
+    solution found so far at the cutoff, so it runs in the calling thread.
+    Parameters:
+        control (SolverControl) : deadline / cancellation of the run, default cutoff seconds from now
+    """
+    data = read_data(f"data 2/{instance}")
+    if data is None:
+        return
+
+    random.seed(randSeed)
+    control = control if control is not None else SolverControl(cutoff)
+    best_S,trace = ls_sa(data, backend=backend, control=control)
 
     if best_S:
         output_solution(best_S,instance,"LS1",cutoff,randSeed=randSeed)
         output_trace(trace,instance,"LS1",cutoff,randSeed)
+
+
+def run_LS1_seeds(instance, cutoff, seeds, backend='python', workers=None, control=None):
+    """
+    Run one ls_sa per seed in a process pool. Every seed writes its .sol/.trace like run_LS1, and the best
+    solution over all seeds is written with the merged best-of trace as {instance}_LS1_{cutoff}_best.sol/.trace.
+    Parameters:
+        seeds ([int]) : random seeds, one run each
+        workers (int) : number of processes, None for one per CPU
+        control (SolverControl) : deadline / cancellation of the whole run, default cutoff seconds from now.
+                                  Cancelling it stops every seed, and it receives the best cover of each seed
+    """
+    data = read_data(f"data 2/{instance}")
+    if data is None:
+        return
+
+    control = control if control is not None else SolverControl(cutoff)
+    cancel_event = multiprocessing.Event()
+    results = {}
+    # every worker returns its best solution at the deadline, seeds whose turn comes later are skipped
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                initargs=(data, cancel_event)) as executor:
+        futures = {executor.submit(_seed_worker, seed, backend, control.deadline - control.start_time,
+                                   control.start_time): seed for seed in seeds}
+        for future in as_completed(futures, control, cancel_event):
+            best_S, trace = results[futures[future]] = future.result()
+            if best_S:
+                control.offer(len(best_S), sorted(k + 1 for k in best_S))
+    results = {seed: result for seed, result in results.items() if result[0]}
+
+    for seed, (best_S, trace) in sorted(results.items()):
+        output_solution(best_S,instance,"LS1",cutoff,randSeed=seed)
+        output_trace(trace,instance,"LS1",cutoff,seed)
+    if results:
+        best_S = min((S for S, _ in results.values()), key=len)
+        output_solution(best_S,instance,"LS1",cutoff,randSeed="best")
+        output_trace(merge_traces([trace for _, trace in results.values()]),instance,"LS1",cutoff,"best")
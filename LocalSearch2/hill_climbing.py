@@ -1,90 +1,263 @@
 #!/usr/bin/env python3
 # LS2 multi‑start hill‑climbing  ——  outputs drop in Result/
 
-import sys, time, random, os           # ←①
+import sys, random, os                 # ←①
+import concurrent.futures, multiprocessing, signal
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from set_cover_instance import load_instance, elements_of
+from solver_control import SolverControl, as_completed
 
 OUT_DIR = "Result"                     # ←① output folder
 os.makedirs(OUT_DIR, exist_ok=True)    # ←②
 
 # ---------- read input ----------
+# U is the universe bitmask, subsets[i] the bitmask of subset i (bit e-1 <=> element e)
 def read_input(filename):
-    with open(filename) as f:
-        lines = f.readlines()
-    n, m = map(int, lines[0].split())
-    subsets = []
-    for line in lines[1:]:
-        nums = list(map(int, line.split()))
-        subsets.append(set(nums[1:]))          # delete first line
-    U = set(range(1, n + 1))
-    return U, subsets
+    inst = load_instance(filename)
+    return inst.universe_mask, inst.masks
 
 # ---------- check if the cover set is valid ----------
 def is_valid(sol, subsets, U):
-    cov = set()
+    cov = 0
     for idx in sol:
         cov |= subsets[idx]
-    return cov >= U
+    return cov & U == U
 
 # ---------- greedy initial ----------
 def initial_solution(U, subsets):
-    uncovered, sol = set(U), []
+    uncovered, sol = U, []
     while uncovered:
-        best = max(range(len(subsets)), key=lambda i: len(subsets[i] & uncovered))
+        best = max(range(len(subsets)), key=lambda i: (subsets[i] & uncovered).bit_count())
         sol.append(best)
-        uncovered -= subsets[best]
+        uncovered &= ~subsets[best]
     return sol
 
+# ---------- element -> subset index ----------
+# elems[i] the elements of subset i, covering[e] the subsets containing e
+def build_index(U, subsets):
+    elems = [elements_of(s & U) for s in subsets]
+    covering = [[] for _ in range(U.bit_length() + 1)]
+    for i, es in enumerate(elems):
+        for e in es:
+            covering[e].append(i)
+    return elems, covering
+
+# ---------- coverage counts ----------
+# count[e] = chosen subsets containing e, crit[i] = elements only i covers (count 1),
+# uncovered = elements of U with count 0 (unordered list, slot[e] its position in it).
+# A chosen subset is removable exactly when crit[i] == 0, i.e. all its elements have count >= 2.
+# add/remove only touch the elements of the flipped subset, O(|subset|) plus one scan of
+# covering[e] when count[e] crosses 1 <-> 2 to find the other chosen subset.
+class Coverage:
+    def __init__(self, sol, elems, covering, U):
+        self.elems, self.covering = elems, covering
+        self.count = [0] * (U.bit_length() + 1)
+        self.chosen = bytearray(len(elems))
+        self.crit = [0] * len(elems)
+        self.removable = set()
+        self.sol, self.pos = [], {}
+        self.uncovered = elements_of(U)
+        self.slot = [0] * len(self.count)
+        for k, e in enumerate(self.uncovered):
+            self.slot[e] = k
+        for i in sol:
+            self.add(i)
+
+    def add(self, i):
+        count, crit, covering = self.count, self.crit, self.covering
+        self.chosen[i] = 1
+        self.pos[i] = len(self.sol)
+        self.sol.append(i)
+        c_i = 0
+        for e in self.elems[i]:
+            count[e] += 1
+            if count[e] == 1:
+                last = self.uncovered.pop()     # swap e out of the uncovered list
+                if last != e:
+                    self.uncovered[self.slot[e]] = last
+                    self.slot[last] = self.slot[e]
+                c_i += 1
+            elif count[e] == 2:                 # the other chosen subset no longer covers e alone
+                for j in covering[e]:
+                    if j != i and self.chosen[j]:
+                        crit[j] -= 1
+                        if not crit[j]:
+                            self.removable.add(j)
+                        break
+        crit[i] = c_i
+        if not c_i:
+            self.removable.add(i)
+
+    def remove(self, i):
+        count, crit, covering = self.count, self.crit, self.covering
+        self.chosen[i] = 0
+        last = self.sol.pop()
+        if last != i:
+            self.sol[self.pos[i]] = last
+            self.pos[last] = self.pos[i]
+        del self.pos[i]
+        self.removable.discard(i)
+        for e in self.elems[i]:
+            count[e] -= 1
+            if count[e] == 0:
+                self.slot[e] = len(self.uncovered)
+                self.uncovered.append(e)
+            elif count[e] == 1:                 # the last chosen subset with e now covers it alone
+                for j in covering[e]:
+                    if self.chosen[j]:
+                        crit[j] += 1
+                        self.removable.discard(j)
+                        break
+
 # ---------- delete 1 subset neighbor ----------
-def get_neighbors(sol, subsets, U):
-    nei = []
-    for idx in sol:
-        cand = sol.copy()
-        cand.remove(idx)
-        if is_valid(cand, subsets, U):
-            nei.append(cand)
-    return nei
+# subsets that can be deleted keeping a cover, none while cur does not cover U
+def get_neighbors(cov):
+    return cov.removable if not cov.uncovered else ()
+
+# ---------- swap / 2-for-1 neighbor ----------
+# Only for a cover without removable subsets. Swapping out a for c keeps the cover iff c contains
+# every element only a covers, checked on the bitmask of those elements over the subsets covering
+# the rarest of them. A valid swap is applied through the coverage counts; if it makes some subset
+# removable it is a 2-for-1 move (the delete step removes it next) and True is returned, otherwise it
+# is undone. Without a 2-for-1 move, one of the valid swaps found is kept as a plateau move and False
+# is returned, None if there was no valid swap at all.
+SWAP_TRIES = 20
+MAX_SWAPS  = 1000                        # plateau swaps in a row before the perturbation
+
+def replace_move(cur, subsets, tries=SWAP_TRIES):
+    elems, covering, count, chosen = cur.elems, cur.covering, cur.count, cur.chosen
+    plateau = None
+    for a in random.sample(cur.sol, min(tries, len(cur.sol))):
+        crit = [e for e in elems[a] if count[e] == 1]
+        need = 0
+        for e in crit:
+            need |= 1 << (e - 1)
+        for c in covering[min(crit, key=lambda e: len(covering[e]))]:
+            if chosen[c] or subsets[c] & need != need:
+                continue
+            cur.remove(a)
+            cur.add(c)
+            if cur.removable:
+                return True
+            cur.remove(c)
+            cur.add(a)
+            if plateau is None or random.random() < 0.5:
+                plateau = (a, c)
+    if plateau is None:
+        return None
+    cur.remove(plateau[0])
+    cur.add(plateau[1])
+    return False
 
 # ---------- one time hill‑climb ----------
-def hill_climb(U, subsets, cutoff, seed, t0):
+# runs until control expires (cutoff or cancel), every new best is offered to control.
+# With shared_best (multiprocessing.Value, best cost over all restarts) the restart also stops once
+# its best is worse than shared_best and `patience` perturbations in a row did not improve it.
+PATIENCE = 1000
+
+def hill_climb(U, subsets, control, seed, index=None, shared_best=None, patience=PATIENCE):
     random.seed(seed)
-    cur   = initial_solution(U, subsets)
-    best, best_cost = cur.copy(), len(cur)
-    trace = [(time.time() - t0, best_cost)]
-    fail  = 0
-
-    while time.time() - t0 < cutoff:
-        nei = get_neighbors(cur, subsets, U)
-        improved = False
-        for cand in nei:
-            if len(cand) < len(cur):
-                cur, improved = cand, True
-                if len(cur) < best_cost:
-                    best, best_cost = cur.copy(), len(cur)
-                    trace.append((time.time() - t0, best_cost))
-                break
-        fail = 0 if improved else fail + 1
-
-        # light perturbation
-        if fail >= 10 and len(cur) > 1:
-            rm = random.choice(cur)
+    elems, covering = index if index is not None else build_index(U, subsets)
+    cur   = Coverage(initial_solution(U, subsets), elems, covering, U)
+    best, best_cost = list(cur.sol), len(cur.sol)
+    trace = [(control.elapsed(), best_cost)]
+    control.offer(best_cost, sorted(i + 1 for i in best))
+    publish(shared_best, best_cost)
+    fail, swaps, stall = 0, 0, 0
+
+    while not control.expired():
+        nei = get_neighbors(cur)
+        improved, swapped = bool(nei), False
+        if not improved and not cur.uncovered:
+            moved = replace_move(cur, subsets)
+            improved, swapped = moved is True, moved is False
+        elif improved:
+            cur.remove(next(iter(nei)))
+            if len(cur.sol) < best_cost:
+                best, best_cost = list(cur.sol), len(cur.sol)
+                trace.append((control.elapsed(), best_cost))
+                control.offer(best_cost, sorted(i + 1 for i in best))
+                publish(shared_best, best_cost)
+                stall = 0
+        if improved:
+            fail, swaps = 0, 0
+        elif swapped:
+            swaps += 1
+        else:
+            fail += 1
+
+        # light perturbation: drop a random subset, add one covering a random uncovered element
+        if (fail >= 10 or swaps >= MAX_SWAPS) and len(cur.sol) > 1:
+            stall += 1
+            if shared_best is not None and stall >= patience and best_cost > shared_best.value:
+                break                            # another restart is ahead, leave the CPU to the next seed
+            rm = random.choice(cur.sol)
             cur.remove(rm)
-            uncovered = U - set().union(*[subsets[i] for i in cur])
-            addable   = [i for i in range(len(subsets)) if subsets[i] & uncovered]
-            if addable:
-                cur.append(random.choice(addable))
-            fail = 0
+            if cur.uncovered:
+                addable = covering[random.choice(cur.uncovered)]
+                if addable:
+                    cur.add(random.choice(addable))
+            fail, swaps = 0, 0
     return best, trace
 
+def publish(shared_best, cost):
+    if shared_best is None:
+        return
+    with shared_best.get_lock():
+        if cost < shared_best.value:
+            shared_best.value = cost
+
 # ---------- multi‑start ----------
-def multi_start(U, subsets, cutoff, seed, k=10):
-    t0 = time.time()
-    best_sol, best_cost, best_trace = None, float('inf'), []
-    for s in range(k):
-        if time.time() - t0 > cutoff: break
-        sol, tr = hill_climb(U, subsets, cutoff, seed + s, t0)
-        if len(sol) < best_cost:
-            best_sol, best_cost, best_trace = sol, len(sol), tr
-    return best_sol, best_trace
+# restarts seed..seed+k-1 run in `workers` processes (None = one per CPU) until the common deadline,
+# sharing the best cost so restarts that fall behind are cut and the next seed starts.
+# Returns the best cover and the best-of trace over all restarts.
+def multi_start(U, subsets, cutoff, seed, k=10, control=None, workers=None):
+    control = control if control is not None else SolverControl(cutoff)
+    index = build_index(U, subsets)
+    shared_best = multiprocessing.Value('i', len(subsets) + 1)
+    results = []
+    if workers == 1:
+        for s in range(k):
+            if control.expired(): break
+            results.append(hill_climb(U, subsets, control, seed + s, index, shared_best))
+    else:
+        # the instance and index go to every process once, through the initializer, not with each restart
+        cancel_event = multiprocessing.Event()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                    initargs=(U, subsets, index, shared_best,
+                                                              cancel_event)) as executor:
+            futures = [executor.submit(_restart, seed + s, control.start_time, control.deadline) for s in range(k)]
+            for future in as_completed(futures, control, cancel_event):
+                if future.result() is not None:
+                    sol, tr = future.result()
+                    control.offer(len(sol), sorted(i + 1 for i in sol))
+                    results.append((sol, tr))
+    best_sol = min((sol for sol, _ in results), key=len, default=None)
+    return best_sol, merge_traces([tr for _, tr in results])
+
+_worker = {}
+
+# Ctrl-C is left to the parent, which sets cancel_event
+def _init_worker(U, subsets, index, shared_best, cancel_event):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker.update(U=U, subsets=subsets, index=index, shared_best=shared_best, cancel_event=cancel_event)
+
+def _restart(seed, start_time, deadline):
+    control = SolverControl(deadline - start_time, start_time, _worker['cancel_event'])
+    if control.expired():
+        return None                              # queued restart whose turn came too late
+    return hill_climb(_worker['U'], _worker['subsets'], control, seed, _worker['index'], _worker['shared_best'])
+
+# best-of trace: at every time the best cost any restart had reached
+def merge_traces(traces):
+    merged, best = [], float('inf')
+    for t, c in sorted(step for tr in traces for step in tr):
+        if c < best:
+            merged.append((t, c))
+            best = c
+    return merged
 
 # ---------- write file ----------
 def write_solution(fname, sol):
@@ -103,9 +276,12 @@ def main():
     inst   = args[args.index('-inst') + 1]
     cut    = int(args[args.index('-time') + 1])
     seed   = int(args[args.index('-seed') + 1])
+    workers = int(args[args.index('-workers') + 1]) if '-workers' in args else None
 
     U, subsets = read_input(inst)
-    sol, trace = multi_start(U, subsets, cut, seed, k=10)
+    control = SolverControl(cut)
+    signal.signal(signal.SIGINT, lambda signum, frame: control.cancel())  # Ctrl-C returns the best cover so far
+    sol, trace = multi_start(U, subsets, cut, seed, k=10, control=control, workers=workers)
 
     assert is_valid(sol, subsets, U), "Final solution NOT covering U!"
 
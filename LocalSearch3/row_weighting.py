@@ -0,0 +1,217 @@
+# This is the code for the 3rd local search algorithm (LS3),
+# a row weighting local search for unicost set cover.
+# Every element (row) has a weight, increased by one each step it stays uncovered, so elements
+# that are hard to cover get more and more attractive instead of a fixed penalty like in LS1.
+# The score of a subset is the total weight it would newly cover if added (for subsets not in S)
+# or minus the total weight only it covers if removed (for subsets in S). Scores are kept up to
+# date through the element -> subset index, so a flip costs O(sum of the degrees of its elements)
+# instead of a rescan of the solution.
+# Each step removes the best-scored subset of S (not the one just added) and adds the best-scored
+# subset covering a random uncovered element. A subset can only be added back once one of its
+# elements changed state since it was removed (configuration checking), ties go to the subset
+# that has not been flipped for the longest time.
+# Whenever S becomes a cover it is recorded and the best-scored subset is dropped, so the search
+# always looks for a cover one smaller than the best one found.
+
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'GreedySetCover'))
+
+from set_cover_instance import load_instance
+from solver_control import SolverControl
+from greedy_set_cover import greedy_set_cover
+
+
+class RowWeightingState:
+    """
+    Solution S with element weights and incrementally maintained subset scores.
+    Attributes:
+        S ([int]) : selected subset indices (unordered, position[k] is the slot of k)
+        uncovered ([int]) : coverable elements with no selected subset (unordered, slot[e] is the slot of e)
+        score ([int]) : gain of adding k if k is not selected, minus the loss of removing k if it is
+        age ([int]) : step at which k was last flipped
+        conf (bytearray) : 1 if k may be added, i.e. one of its elements changed state since k was removed
+    """
+    def __init__(self, instance):
+        n, m = instance.n, instance.m
+        self.instance = instance
+        self.weight = [1] * (n + 1)
+        self.count = [0] * (n + 1)
+        self.selected = bytearray(m)
+        self.score = [instance.size(k) for k in range(m)]
+        self.age = [0] * m
+        self.conf = bytearray(b'\x01' * m)
+        self.S = []
+        self.position = [0] * m
+        # elements contained in no subset can never be covered, they are left out like in LS1
+        self.uncovered = [e for e in range(1, n + 1) if len(instance.covering(e))]
+        self.slot = [0] * (n + 1)
+        for k, e in enumerate(self.uncovered):
+            self.slot[e] = k
+        self.step = 0
+
+    def _cover(self, e):
+        k = self.slot[e]
+        last = self.uncovered.pop()
+        if last != e:
+            self.uncovered[k] = last
+            self.slot[last] = k
+
+    def _uncover(self, e):
+        self.slot[e] = len(self.uncovered)
+        self.uncovered.append(e)
+
+    def add(self, k):
+        instance, count, weight, score, conf, selected = \
+            self.instance, self.count, self.weight, self.score, self.conf, self.selected
+        selected[k] = 1
+        self.position[k] = len(self.S)
+        self.S.append(k)
+        score[k] = -score[k]  # what k newly covers is exactly what only k covers now
+        for e in instance.elements(k):
+            c = count[e] + 1
+            count[e] = c
+            if c == 1:  # e becomes covered, the other subsets containing e no longer gain it
+                self._cover(e)
+                w = weight[e]
+                for j in instance.covering(e):
+                    if j != k:
+                        score[j] -= w
+                        conf[j] = 1
+            elif c == 2:  # the subset of S that covered e alone can now drop it
+                for j in instance.covering(e):
+                    if j != k and selected[j]:
+                        score[j] += weight[e]
+                        break
+        self.age[k] = self.step
+
+    def remove(self, k):
+        instance, count, weight, score, conf, selected = \
+            self.instance, self.count, self.weight, self.score, self.conf, self.selected
+        selected[k] = 0
+        slot = self.position[k]
+        last = self.S.pop()
+        if last != k:
+            self.S[slot] = last
+            self.position[last] = slot
+        score[k] = -score[k]
+        for e in instance.elements(k):
+            c = count[e] - 1
+            count[e] = c
+            if c == 0:  # e becomes uncovered, every subset containing e would gain it
+                self._uncover(e)
+                w = weight[e]
+                for j in instance.covering(e):
+                    if j != k:
+                        score[j] += w
+                        conf[j] = 1
+            elif c == 1:  # the remaining subset of S covering e is now its only cover
+                for j in instance.covering(e):
+                    if selected[j]:
+                        score[j] -= weight[e]
+                        break
+        conf[k] = 0
+        self.age[k] = self.step
+
+    def increase_weights(self):
+        """
+        Add one to the weight of every uncovered element.
+        """
+        weight, score, instance = self.weight, self.score, self.instance
+        for e in self.uncovered:
+            weight[e] += 1
+            for j in instance.covering(e):
+                score[j] += 1
+
+    def best_to_remove(self, tabu=None):
+        """
+        Subset of S with the highest score (smallest loss), the oldest one on ties.
+        """
+        score, age = self.score, self.age
+        return max((k for k in self.S if k != tabu), key=lambda k: (score[k], -age[k]), default=None)
+
+    def best_to_add(self, e):
+        """
+        Subset covering element e with the highest score among those allowed by configuration checking,
+        the oldest one on ties.
+        """
+        score, age, conf = self.score, self.age, self.conf
+        candidates = [k for k in self.instance.covering(e) if conf[k]] or self.instance.covering(e)
+        return max(candidates, key=lambda k: (score[k], -age[k]))
+
+
+def rwls(instance, control, seed=0):
+    """
+    Row weighting local search.
+    Parameters:
+        instance (SetCoverInstance) : instance.covering(e) is the element -> subset index
+        control (SolverControl) : the search runs until it expires and offers every improved cover
+        seed (int) : random seed
+    Returns:
+        [int]: best cover found (0-based subset indices)
+        [(float, int)]: trace, (seconds since control.start_time, cover size)
+    """
+    random.seed(seed)
+    state = RowWeightingState(instance)
+    for k in greedy_set_cover(instance):
+        state.add(k - 1)
+    for k in sorted(state.S, key=lambda k: instance.size(k)):  # drop redundant subsets
+        if state.score[k] == 0:
+            state.remove(k)
+
+    best = list(state.S)
+    trace = [(control.elapsed(), len(best))]
+    control.offer(len(best), sorted(k + 1 for k in best))
+    added = None
+    while not control.expired():
+        if not state.uncovered:
+            if len(state.S) < len(best):
+                best = list(state.S)
+                trace.append((control.elapsed(), len(best)))
+                control.offer(len(best), sorted(k + 1 for k in best))
+            state.remove(state.best_to_remove())
+            continue
+        state.step += 1
+        k = state.best_to_remove(tabu=added)
+        if k is not None:
+            state.remove(k)
+        e = random.choice(state.uncovered)
+        added = state.best_to_add(e)
+        state.add(added)
+        state.increase_weights()
+    return best, trace
+
+
+def output_solution(S, instance, cutoff, randSeed):
+    os.makedirs("Result_LS3", exist_ok=True)
+    filename = f"Result_LS3/{instance}_LS3_{cutoff}_{randSeed}.sol"
+    with open(filename, "w") as f:
+        f.write(f"{len(S)}\n")
+        f.write(" ".join(str(k + 1) for k in sorted(S)) + "\n")
+
+
+def output_trace(trace, instance, cutoff, randSeed):
+    os.makedirs("Result_LS3", exist_ok=True)
+    filename = f"Result_LS3/{instance}_LS3_{cutoff}_{randSeed}.trace"
+    with open(filename, "w") as f:
+        for t, quality in trace:
+            f.write(f"{t:.4f} {quality}\n")
+
+
+def run_LS3(instance, cutoff, randSeed, control=None):
+    """
+    Run rwls on data/<instance> until the cutoff and write its .sol/.trace to Result_LS3.
+    """
+    try:
+        data = load_instance(f"data/{instance}")
+    except FileNotFoundError:
+        print(f"Error: File not found at data/{instance}")
+        return
+    control = control if control is not None else SolverControl(cutoff)
+    best_S, trace = rwls(data, control, randSeed)
+    name = instance[:-3] if instance.endswith('.in') else instance
+    output_solution(best_S, name, cutoff, randSeed)
+    output_trace(trace, name, cutoff, randSeed)
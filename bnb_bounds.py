@@ -0,0 +1,271 @@
+# Lower bound engines for branch_and_bound.
+# A node of the include/exclude tree is described by the bitmask of its uncovered elements, the
+# index of the first subset that is still free (subsets before it are already decided) and a
+# bitmask of free subsets that were fixed out of the subtree.
+#
+# Every engine exposes bound(uncovered, start, excluded, warm, budget) returning
+# (lb, used, warm, fixed):
+#   lb     lower bound on the number of subsets still needed (inf if no cover exists)
+#   used   bitmask of the subsets the bound relies on. Excluding a subset outside this mask
+#          leaves the bound unchanged, so the exclude child can reuse its parent's bound
+#   warm   engine state the children of the node start from (None if the engine has none)
+#   fixed  bitmask of free subsets that cannot appear in a cover cheaper than budget
+#
+# TieredBound runs cheap bounds first and only escalates to the expensive ones when the cheap
+# bounds do not reach the budget.
+
+
+import heapq
+import math
+
+try:
+    import numpy as np
+except ImportError:  # only the lagrangian bound needs numpy
+    np = None
+
+from set_cover_instance import elements_of
+
+
+class FractionalBound:
+    '''
+    Fractional greedy bound: repeatedly take the free subset covering the most uncovered elements
+    and add 1/|covered| to the bound.
+    Residual coverage counts are computed once per node, then the greedy only decrements the
+    subsets that share an element with the newly covered ones (element -> subset index). A lazy
+    heap of (-count, index) picks the first subset with the largest count, like a full rescan.
+    '''
+
+    def __init__(self, instance):
+        self.instance = instance
+        self.masks = instance.masks
+        self.counts = [0] * instance.m  # scratch buffer reused across calls
+
+    def bound(self, uncovered, start, excluded=0, warm=None, budget=float('inf')):
+        '''
+        :param uncovered: bitmask of the uncovered elements of the node
+        :param start: subsets[start:] are the ones that may still be chosen
+        :param excluded: bitmask of subsets that may not be chosen
+        :param warm: unused
+        :param budget: unused
+        :return: (lower bound, bitmask of the subsets used by the greedy, None, 0)
+        '''
+        masks, counts, instance = self.masks, self.counts, self.instance
+        heap = []
+        for j in range(start, len(masks)):
+            c = 0 if (excluded >> j) & 1 else (masks[j] & uncovered).bit_count()
+            counts[j] = c
+            if c:
+                heap.append((-c, j))
+        heapq.heapify(heap)
+
+        lb = 0.0
+        used = 0
+        while uncovered:
+            if not heap:
+                return float('inf'), used, None, 0  # No set cover exists
+            neg_count, j = heapq.heappop(heap)
+            c = counts[j]
+            if -neg_count != c:
+                if c:
+                    heapq.heappush(heap, (-c, j))  # stale entry
+                continue
+
+            lb += 1.0 / c  # Add a fraction to count as low-bound
+            used |= 1 << j
+            newly_covered = masks[j] & uncovered
+            uncovered &= ~newly_covered
+            for e in elements_of(newly_covered):
+                for k in instance.covering(e):
+                    counts[k] -= 1
+        return lb, used, None, 0
+
+
+class LagrangianBound:
+    '''
+    Lagrangian relaxation of the covering constraints, optimised by subgradient steps:
+        L(u) = sum_e u_e + sum_{free j} min(0, 1 - sum_{e in S_j} u_e),   u >= 0, e uncovered
+    Any u gives a valid bound, and since costs are integral the bound is rounded up.
+    The multipliers of a node warm-start the bounds of its children, so a child usually needs only
+    a few steps. Free subsets with reduced cost c_j > 0 and ceil(L + c_j) >= budget are fixed out.
+    The subproblem is restricted to the uncovered elements / free subsets and evaluated with numpy.
+    '''
+
+    def __init__(self, instance, iterations=30, root_iterations=300, step=2.0):
+        if np is None:
+            raise ImportError("the lagrangian bound requires numpy")
+        self.n, self.m = instance.n, instance.m
+        offsets = np.asarray(instance.offsets, dtype=np.int64)
+        self.idx = np.asarray(instance.indices, dtype=np.int64)   # element of each CSR entry
+        self.row = np.repeat(np.arange(self.m), np.diff(offsets))  # subset of each CSR entry
+        self.width = (self.n + 7) // 8
+        self.iterations = iterations
+        self.root_iterations = root_iterations
+        self.step = step
+
+    def _unpack(self, mask, length, shift=0):
+        '''Bitmask -> bool array, entry k holds bit k - shift.'''
+        raw = np.frombuffer((mask << shift).to_bytes((length + 7) // 8, 'little'), dtype=np.uint8)
+        return np.unpackbits(raw, bitorder='little')[:length].astype(bool)
+
+    def _pack(self, flags):
+        return int.from_bytes(np.packbits(flags, bitorder='little').tobytes(), 'little')
+
+    def bound(self, uncovered, start, excluded=0, warm=None, budget=float('inf')):
+        '''
+        :param uncovered: bitmask of the uncovered elements of the node
+        :param start: subsets[start:] are the ones that may still be chosen
+        :param excluded: bitmask of subsets that may not be chosen
+        :param warm: multipliers of the parent node (None at the root)
+        :param budget: number of further subsets that would only tie the incumbent
+        :return: (lb, subsets with negative reduced cost, multipliers, fixed-out subsets)
+        '''
+        if not uncovered:
+            return 0, 0, warm, 0
+        n, m = self.n, self.m
+        unc = self._unpack(uncovered, n + 1, shift=1)  # index = element id
+        free = self._unpack(~excluded & ((1 << m) - 1), m)
+        free[:start] = False
+
+        keep = unc[self.idx] & free[self.row]
+        idx, row = self.idx[keep], self.row[keep]
+        if np.count_nonzero(np.bincount(idx, minlength=n + 1)[unc]) < np.count_nonzero(unc):
+            return float('inf'), 0, warm, 0  # some uncovered element has no free covering subset
+
+        if warm is None:
+            # u_e = min over covering subsets of 1/|S_j|, a feasible dual solution
+            u = np.full(n + 1, np.inf)
+            np.minimum.at(u, idx, 1.0 / np.bincount(row, minlength=m)[row])
+            u[~unc] = 0.0
+            iterations = self.root_iterations
+        else:
+            u = np.where(unc, warm, 0.0)
+            iterations = self.iterations
+
+        best_L, best_u = -np.inf, u
+        lam = self.step
+        stall = 0
+        for _ in range(iterations):
+            rc = 1.0 - np.bincount(row, weights=u[idx], minlength=m)
+            neg = free & (rc < 0)
+            L = u.sum() + rc[neg].sum()
+            if L > best_L + 1e-9:
+                best_L, best_u, stall = L, u, 0
+            else:
+                stall += 1
+                if stall >= 5:
+                    lam /= 2
+                    stall = 0
+            if math.ceil(best_L - 1e-6) >= budget:
+                break  # already prunes the node
+
+            g = 1.0 - np.bincount(idx[neg[row]], minlength=n + 1)
+            g[~unc] = 0.0
+            g[(u <= 0) & (g < 0)] = 0.0
+            norm = float(g @ g)
+            if norm == 0.0 or lam < 1e-4:
+                break  # u is optimal for the relaxation or the steps became useless
+            target = budget if budget < float('inf') else 1.05 * L + 1.0
+            u = np.maximum(0.0, u + lam * (target - L) / norm * g)
+
+        rc = 1.0 - np.bincount(row, weights=best_u[idx], minlength=m)
+        lb = math.ceil(best_L - 1e-6)
+        used = self._pack(free & (rc < 0))
+        fixed = self._pack(free & (rc > 0) & (np.ceil(best_L + rc - 1e-6) >= budget)) if budget < float('inf') else 0
+        return lb, used, best_u.astype(np.float32), fixed
+
+
+class SizeBound:
+    '''
+    Size bound: ceil(|uncovered| / s), s the largest original size among subsets[start:] (a precomputed suffix
+    maximum). excluded is ignored and sizes are not reduced to the still uncovered elements, so s can only be larger
+    than the best residual coverage: the bound is valid but weaker than ceil(|uncovered| / max |subset & uncovered|),
+    in exchange for a call that is O(1) apart from the popcount.
+    '''
+
+    def __init__(self, instance):
+        sizes = [mask.bit_count() for mask in instance.masks]
+        self.suffix_max = [0] * (len(sizes) + 1)  # suffix_max[start] = max(sizes[start:])
+        for j in range(len(sizes) - 1, -1, -1):
+            self.suffix_max[j] = max(sizes[j], self.suffix_max[j + 1])
+
+    def bound(self, uncovered, start, excluded=0, warm=None, budget=float('inf')):
+        k = uncovered.bit_count()
+        if not k:
+            return 0, 0, None, 0
+        largest = self.suffix_max[start]
+        return (-(-k // largest) if largest else float('inf')), 0, None, 0
+
+
+class PackingBound:
+    '''
+    Disjoint-element packing bound: greedily pick uncovered elements, rarest first, such that no two of them share a
+    free covering subset. Every picked element needs its own subset. O(k) big-int operations for k uncovered elements.
+    '''
+
+    def __init__(self, instance):
+        m = instance.m
+        self.all = (1 << m) - 1
+        self.degree = [0] * (instance.n + 1)
+        self.columns = [0] * (instance.n + 1)  # bitmask of the subsets covering each element
+        for e in range(1, instance.n + 1):
+            cov = instance.covering(e)
+            self.degree[e] = len(cov)
+            buf = bytearray((m + 7) // 8)
+            for j in cov:
+                buf[j >> 3] |= 1 << (j & 7)
+            self.columns[e] = int.from_bytes(buf, 'little')
+
+    def bound(self, uncovered, start, excluded=0, warm=None, budget=float('inf')):
+        free = self.all & ~excluded & ~((1 << start) - 1)
+        blocked = 0
+        lb = 0
+        for e in sorted(elements_of(uncovered), key=self.degree.__getitem__):
+            cov = self.columns[e] & free
+            if not cov:
+                return float('inf'), 0, None, 0
+            if not cov & blocked:
+                lb += 1
+                blocked |= cov
+                if lb >= budget:
+                    break
+        return lb, 0, None, 0
+
+
+class TieredBound:
+    '''
+    Cheap-first bounding pipeline: size bound, packing bound, then the requested bound. The fractional bound is not
+    run in front of the lagrangian one, it almost never prunes what the lagrangian bound keeps and costs about as
+    much. The first tier reaching the budget prunes the node. Otherwise the last tier gives the node's used
+    subsets, warm start and fixing, and its bound is raised to the best bound of the cheaper tiers.
+    Calls and prunes of each tier are counted in stats.tier_calls / stats.tier_prunes if stats is given.
+    '''
+
+    def __init__(self, instance, final='fractional', stats=None):
+        self.tiers = [('size', SizeBound(instance)), ('packing', PackingBound(instance)),
+                      (final, make_bound(final, instance))]
+        self.stats = stats
+
+    def bound(self, uncovered, start, excluded=0, warm=None, budget=float('inf')):
+        tiers = self.tiers if budget < float('inf') else self.tiers[-1:]  # without a budget nothing can be pruned
+        best = 0
+        for name, engine in tiers:
+            result = engine.bound(uncovered, start, excluded, warm, budget)
+            if self.stats is not None:
+                self.stats.tier_calls[name] = self.stats.tier_calls.get(name, 0) + 1
+            if result[0] >= budget:
+                if self.stats is not None:
+                    self.stats.tier_prunes[name] = self.stats.tier_prunes.get(name, 0) + 1
+                return result
+            best = max(best, result[0])
+        return (best,) + result[1:]
+
+
+BOUNDS = {
+    'fractional': FractionalBound,
+    'lagrangian': LagrangianBound,
+}
+
+
+def make_bound(name, instance):
+    '''Instantiate the bound engine registered under name.'''
+    return BOUNDS[name](instance)
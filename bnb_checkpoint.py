@@ -0,0 +1,79 @@
+# Checkpoints of a running branch_and_bound: the open nodes (priority queue and depth-first stack),
+# the incumbent, the trace_log and the elapsed time. A checkpoint is only valid for the instance
+# it was written for (after reduction) and for the same bound and branching rule.
+
+
+import gzip
+import hashlib
+import os
+import pickle
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_KEYS = {'version', 'fingerprint', 'settings', 'queue', 'stack', 'best_res', 'trace_log', 'elapsed'}
+
+
+def instance_fingerprint(instance):
+    '''Hash of the subsets of an instance, used to refuse a checkpoint written for another instance.'''
+    h = hashlib.sha1()
+    h.update(f"{instance.n} {instance.m}".encode())
+    h.update(instance.offsets.tobytes())
+    h.update(instance.indices.tobytes())
+    return h.hexdigest()
+
+
+def _pack_node(node, selected):
+    return (node.est, node.count, node.index, node.uncovered, selected, node.used, node.warm, node.excluded)
+
+
+def save_checkpoint(path, instance, settings, queue, stack, best_res, trace_log, elapsed, selected_subsets):
+    '''
+    Write a checkpoint atomically (a crash while writing keeps the previous checkpoint).
+    :param path: checkpoint file
+    :param instance: instance being searched
+    :param settings: dict of search settings that must match on resume (bound, branching, ...)
+    :param queue, stack: open nodes of the search
+    :param best_res: (cost, selected subsets) of the incumbent
+    :param trace_log: [(time, cost)]
+    :param elapsed: seconds spent in the search so far
+    :param selected_subsets: function materialising a node's chain into a list of subsets
+    '''
+    state = {
+        'version': CHECKPOINT_VERSION,
+        'fingerprint': instance_fingerprint(instance),
+        'settings': settings,
+        'queue': [_pack_node(node, selected_subsets(node.chain)) for node in queue],
+        'stack': [_pack_node(node, selected_subsets(node.chain)) for node in stack],
+        'best_res': best_res,
+        'trace_log': trace_log,
+        'elapsed': elapsed,
+    }
+    tmp = path + '.tmp'
+    with gzip.open(tmp, 'wb', compresslevel=1) as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path, instance, settings, node_type):
+    '''
+    Read a checkpoint written by save_checkpoint.
+    :param node_type: class used to rebuild the nodes, the selected list becomes the node's chain
+    :return: (queue, stack, best_res, trace_log, elapsed). queue keeps its heap order.
+    :raise ValueError: if the file is not a checkpoint, or the checkpoint belongs to another instance or other settings
+    :raise OSError: if the file cannot be read or is not gzip-compressed
+    '''
+    try:
+        with gzip.open(path, 'rb') as f:
+            state = pickle.load(f)
+    except (pickle.UnpicklingError, EOFError) as e:
+        raise ValueError(f"{path} is not a readable checkpoint: {e}") from e
+    if not isinstance(state, dict) or not CHECKPOINT_KEYS <= state.keys():
+        raise ValueError(f"{path} is not a checkpoint")
+    if state['version'] != CHECKPOINT_VERSION:
+        raise ValueError(f"unsupported checkpoint version in {path}")
+    if state['fingerprint'] != instance_fingerprint(instance):
+        raise ValueError(f"checkpoint {path} was written for a different instance")
+    if state['settings'] != settings:
+        raise ValueError(f"checkpoint {path} was written with settings {state['settings']}, not {settings}")
+    queue = [node_type(*fields) for fields in state['queue']]
+    stack = [node_type(*fields) for fields in state['stack']]
+    return queue, stack, state['best_res'], state['trace_log'], state['elapsed']
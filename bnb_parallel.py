@@ -0,0 +1,214 @@
+# Multiprocess branch_and_bound.
+# Every worker runs its own best-first search (same node expansion as the sequential version) on the
+# subtrees it owns. Subtrees move between workers through a shared frontier queue: a worker whose
+# heap runs dry steals from it, and busy workers donate nodes whenever it runs low. The incumbent
+# cost lives in shared memory so every worker prunes against the global best, and improvements are
+# reported back to the parent process, which builds the usual trace_log.
+
+
+import heapq
+import multiprocessing as mp
+import queue as queue_module
+import time
+
+from Branch_and_bound import initial_upper_bound, root_node, selected_subsets, primal_dive, build_bound_engine, \
+    offer_incumbent, BRANCHING
+from bnb_reduction import reduce_instance
+from bnb_stats import SearchStats
+from solver_control import SolverControl
+from bnb_transposition import TranspositionTable
+
+FRONTIER = 0  # shared counters: nodes waiting in the frontier queue
+BUSY = 1      # workers currently owning at least one node
+
+
+def _share(frontier, node):
+    '''Send a node to the frontier with its chain flattened, so it pickles without deep recursion.'''
+    node.chain = selected_subsets(node.chain)
+    frontier.put(node)
+
+
+def _report(best, results, start_time, count, selected):
+    '''Publish a new incumbent if it beats the shared best cost.'''
+    with best.get_lock():
+        if count < best.value:
+            best.value = count
+            results.put((time.time() - start_time, count, selected))
+
+
+def _worker(instance, bound, tiered, branching, table_size, dive_every, start_time, cutoff_time, workers, best, frontier,
+            counters, results, stop):
+    stats = SearchStats()
+    bound_engine = build_bound_engine(bound, instance, stats, tiered)
+    table = TranspositionTable(table_size, stats) if table_size else None  # per worker, it only sees its own subtrees
+    expand = BRANCHING[branching]
+    local = []
+
+    while not stop.is_set():
+        if not local:
+            try:
+                node = frontier.get(timeout=0.05)  # steal a subtree
+            except queue_module.Empty:
+                with counters.get_lock():
+                    if counters[FRONTIER] == 0 and counters[BUSY] == 0:
+                        stop.set()  # nobody owns work and nothing is waiting: the tree is exhausted
+                continue
+            with counters.get_lock():
+                counters[FRONTIER] -= 1
+                counters[BUSY] += 1
+            local.append(node)
+
+        if time.time() - start_time > cutoff_time:
+            stop.set()
+            break
+
+        # no dive on a worker's first node, it would hold up the start of the search
+        if dive_every and stats.nodes_popped and stats.nodes_popped % dive_every == 0 and not stop.is_set() \
+                and time.time() - start_time <= cutoff_time:
+            dive = primal_dive(local[0], instance)
+            if dive is not None and dive[0] < best.value:
+                _report(best, results, start_time, dive[0], dive[1])
+                stats.dive_improvements += 1
+
+        node = heapq.heappop(local)
+        stats.nodes_popped += 1
+        if node.est >= best.value:  # the incumbent improved since the node was pushed
+            stats.pruned_by_bound += 1
+        elif not node.uncovered:  # leaf node
+            _report(best, results, start_time, node.count, selected_subsets(node.chain))
+        else:
+            children = expand(node, instance, bound_engine, best.value, table)
+            stats.nodes_pushed += len(children)
+            for child in children:
+                heapq.heappush(local, child)
+        stats.max_frontier = max(stats.max_frontier, len(local))
+
+        # Donate work while other workers are starving. The last array entry of a heap can be removed without
+        # breaking the heap, and it is rarely the most promising node.
+        while len(local) > 1 and counters[FRONTIER] < workers - counters[BUSY] + 1:
+            with counters.get_lock():
+                counters[FRONTIER] += 1
+            _share(frontier, local.pop())
+
+        if not local:
+            with counters.get_lock():
+                counters[BUSY] -= 1
+
+    results.put(('stats', stats))
+    frontier.cancel_join_thread()  # undelivered subtrees are dropped once the search stops
+
+
+def parallel_branch_and_bound(instance, cutoff_time, workers, bound='fractional', reduce=True, branching='index',
+                              stats=None, table_size=2 ** 16, dive_every=1000, incumbent=None, tiered=True,
+                              control=None):
+    '''
+    Branch and bound over several processes sharing the incumbent.
+    :param instance: SetCoverInstance
+    :param cutoff_time: cutoff time in seconds
+    :param workers: number of worker processes
+    :param bound: name of the lower bound engine in bnb_bounds.BOUNDS
+    :param reduce: search the kernel left by the reduction pre-pass
+    :param branching: branching rule, see Branch_and_bound.BRANCHING
+    :param stats: SearchStats receiving the counters of all workers. max_frontier is per worker, and the best open
+                  lower bound is only known when the tree is exhausted
+    :param table_size: entries of each worker's transposition table, 0 to disable
+    :param dive_every: nodes between two primal dives of a worker, 0 to disable
+    :param incumbent: (cost, 1-based subset indices) of a known cover replacing the greedy upper bound if better
+    :param tiered: try cheap bounds first, see Branch_and_bound.build_bound_engine
+    :param control: SolverControl stopping the search and receiving every incumbent, None for a control expiring
+                    cutoff_time from now. Workers stop at its deadline, or as soon as the parent sees it cancelled
+    :return: (best_res, trace_log), same format as branch_and_bound
+    '''
+    start_time = time.time()
+    control = control if control is not None else SolverControl(cutoff_time, start_time)
+    stats = stats if stats is not None else SearchStats()
+    reduction = reduce_instance(instance) if reduce else None
+    if reduction is not None:
+        stats.cost_offset = len(reduction.forced)
+        known = reduction.project(incumbent[1]) if incumbent is not None else None
+        best_res, trace_log = _search(reduction.kernel, reduction, start_time, control, workers, bound, tiered,
+                                      branching, stats, table_size, dive_every, known)
+        return reduction.lift(best_res, trace_log)
+    known = incumbent[1] if incumbent is not None else None
+    return _search(instance, None, start_time, control, workers, bound, tiered, branching, stats, table_size,
+                   dive_every, known)
+
+
+def _search(instance, reduction, start_time, control, workers, bound, tiered, branching, stats, table_size,
+            dive_every, known):
+    subsets = instance.masks
+
+    best_cost, best_subsets = initial_upper_bound(instance.universe_mask, subsets)
+    if known is not None and len(known) < best_cost:
+        best_cost, best_subsets = len(known), known
+    best_res = (best_cost, best_subsets)
+    trace_log = [(0.00, best_cost)]
+
+    # Expand the top of the tree here until there is enough work to hand out
+    bound_engine = build_bound_engine(bound, instance, stats, tiered)
+    expand = BRANCHING[branching]
+    table = TranspositionTable(table_size, stats) if table_size else None
+    seeds = [root_node(instance, bound_engine, best_cost)]
+    offer_incumbent(control, reduction, best_res)
+    while seeds and len(seeds) < 4 * workers and not control.expired():
+        node = heapq.heappop(seeds)
+        stats.nodes_popped += 1
+        if node.est >= best_res[0]:
+            stats.pruned_by_bound += 1
+            continue
+        if not node.uncovered:
+            best_res = (node.count, selected_subsets(node.chain))
+            trace_log.append((time.time() - start_time, node.count))
+            offer_incumbent(control, reduction, best_res)
+            continue
+        children = expand(node, instance, bound_engine, best_res[0], table)
+        stats.nodes_pushed += len(children)
+        for child in children:
+            heapq.heappush(seeds, child)
+    if not seeds:
+        stats.update(time.time() - start_time, best_res[0], [], [])
+        return best_res, trace_log
+
+    best = mp.Value('i', best_res[0] if best_res[0] != float('inf') else instance.m + 1)
+    counters = mp.Array('i', [len(seeds), 0])
+    frontier, results, stop = mp.Queue(), mp.Queue(), mp.Event()
+    for node in seeds:
+        _share(frontier, node)
+
+    procs = [mp.Process(target=_worker, daemon=True,
+                        args=(instance, bound, tiered, branching, table_size, dive_every, start_time,
+                              control.deadline - start_time, workers, best, frontier, counters, results, stop))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+
+    def collect(timeout):
+        nonlocal best_res
+        try:
+            item = results.get(timeout=timeout)
+        except queue_module.Empty:
+            return
+        if item[0] == 'stats':
+            stats.merge(item[1])
+            return
+        elapsed, count, selected = item
+        if count < best_res[0]:
+            best_res = (count, selected)
+            trace_log.append((elapsed, count))
+            offer_incumbent(control, reduction, best_res)
+
+    while not stop.is_set() and not control.expired():
+        collect(0.1)
+    stop.set()
+    while any(p.is_alive() for p in procs):
+        collect(0.05)
+    while not results.empty():
+        collect(0.05)
+    for p in procs:
+        p.join()
+    frontier.cancel_join_thread()
+
+    stats.update(time.time() - start_time, best_res[0], [], [])
+    if counters[FRONTIER] or counters[BUSY]:
+        stats.best_open_lb = float('inf')  # open nodes were spread over the workers
+    return best_res, trace_log
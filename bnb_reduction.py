@@ -0,0 +1,148 @@
+# Instance reduction (kernelization) run before branch_and_bound.
+# The classic set cover reductions are applied until none of them changes the instance:
+#   - a subset that is the only cover of some element is forced into the solution
+#   - a subset contained in another subset (or a duplicate of an earlier one) is dropped
+#   - an element whose covering subsets include all covering subsets of another element is
+#     dropped, covering the other element covers it too
+# All of them preserve at least one optimal cover, so solving the kernel and adding the forced
+# subsets back gives an optimal cover of the original instance.
+
+
+from array import array
+
+from set_cover_instance import SetCoverInstance, elements_of
+
+
+class Reduction:
+    '''
+    Result of reduce_instance.
+    Attributes:
+        kernel (SetCoverInstance): reduced instance, elements and subsets renumbered
+        kept (list[int]): kept[i] is the original 0-based index of kernel subset i
+        forced (list[int]): original 0-based indices of the subsets forced into every solution
+        replaced (dict[int, int]): dominated subset -> subset dominating it when it was dropped
+    '''
+
+    __slots__ = ('kernel', 'kept', 'forced', 'replaced')
+
+    def __init__(self, kernel, kept, forced, replaced):
+        self.kernel = kernel
+        self.kept = kept
+        self.forced = forced
+        self.replaced = replaced
+
+    def lift(self, best_solution, trace_log):
+        '''
+        Map a BnB result on the kernel back to the original instance.
+        :param best_solution: (cost, 1-based kernel subset indices)
+        :param trace_log: [(time, cost)] on the kernel
+        :return: (cost, 1-based original subset indices), trace_log with original costs. An infeasible result
+                 (cost inf, no cover) is returned unchanged
+        '''
+        cost, selected = best_solution
+        if cost == float('inf'):
+            return best_solution, trace_log
+        offset = len(self.forced)
+        selected = sorted([self.kept[i - 1] + 1 for i in selected] + [j + 1 for j in self.forced])
+        return (cost + offset, selected), [(t, c + offset) for t, c in trace_log]
+
+    def project(self, selected):
+        '''
+        Map a cover of the original instance to a cover of the kernel. Every dominated subset is replaced by the
+        subset dominating it, the forced subsets are dropped. A cover always reaches all forced subsets this way,
+        so the kernel cover costs at most the original cost minus len(forced).
+        :param selected: 1-based original subset indices of a cover
+        :return: sorted 1-based kernel subset indices
+        '''
+        position = {j: i for i, j in enumerate(self.kept)}
+        projected = set()
+        for j in selected:
+            j -= 1
+            while j in self.replaced:
+                j = self.replaced[j]
+            if j in position:
+                projected.add(position[j] + 1)
+        return sorted(projected)
+
+
+def reduce_instance(instance):
+    '''
+    Apply the reductions until a fixed point is reached.
+    :param instance: SetCoverInstance
+    :return: Reduction
+    '''
+    m = instance.m
+    masks = list(instance.masks)
+    alive = [True] * m
+    live = instance.universe_mask  # elements still to be covered
+    forced = []
+    replaced = {}
+
+    changed = True
+    while changed and live:
+        changed = False
+        live_elements = elements_of(live)
+        cover = {e: [j for j in instance.covering(e) if alive[j]] for e in live_elements}
+
+        # Subsets that are the only cover of an element
+        for e, cov in cover.items():
+            if len(cov) == 1 and alive[cov[0]]:
+                j = cov[0]
+                forced.append(j)
+                alive[j] = False
+                live &= ~masks[j]
+                changed = True
+        if changed:
+            continue
+
+        is_live = bytearray(instance.n + 1)
+        for e in live_elements:
+            is_live[e] = 1
+        sizes = [0] * m
+        for j in range(m):
+            if alive[j]:
+                masks[j] &= live
+                sizes[j] = masks[j].bit_count()
+                if not sizes[j]:
+                    alive[j] = False
+
+        # Dominated and duplicate subsets. Only subsets sharing the rarest element of j can contain j.
+        for j in sorted((j for j in range(m) if alive[j]), key=lambda j: sizes[j]):
+            rarest = min((e for e in instance.elements(j) if is_live[e]), key=lambda e: len(cover[e]))
+            for k in cover[rarest]:
+                if k != j and alive[k] and not masks[j] & ~masks[k] and (masks[j] != masks[k] or k < j):
+                    alive[j] = False
+                    replaced[j] = k
+                    changed = True
+                    break
+
+        # Dominated elements, comparing the bitmasks of their covering subsets. Only elements of a subset covering
+        # e can have a superset of e's covers.
+        columns = {}
+        for e, cov in cover.items():
+            cover[e] = cov = [j for j in cov if alive[j]]
+            buf = bytearray((m + 7) // 8)
+            for j in cov:
+                buf[j >> 3] |= 1 << (j & 7)
+            columns[e] = int.from_bytes(buf, 'little')
+        for e in sorted(columns, key=lambda e: len(cover[e])):
+            if not is_live[e] or not cover[e]:
+                continue
+            j = min(cover[e], key=lambda k: sizes[k])
+            for e2 in instance.elements(j):
+                if e2 != e and is_live[e2] and not columns[e] & ~columns[e2] \
+                        and (columns[e] != columns[e2] or e < e2):
+                    is_live[e2] = 0
+                    live &= ~(1 << (e2 - 1))
+                    changed = True
+
+    # Renumber the remaining elements and subsets into the kernel
+    renumber = {e: i for i, e in enumerate(elements_of(live), 1)}
+    kept = [j for j in range(m) if alive[j] and masks[j] & live]
+    offsets = array('q', [0])
+    indices = array('i')
+    for j in kept:
+        indices.extend(renumber[e] for e in elements_of(masks[j] & live))
+        offsets.append(len(indices))
+    kernel = SetCoverInstance(len(renumber), len(kept), offsets, indices)
+    return Reduction(kernel, kept, forced, replaced)
@@ -0,0 +1,101 @@
+# Search statistics for branch_and_bound: node counters, frontier size, time spent computing lower
+# bounds and the best open lower bound (optimality gap). They can be streamed as JSON lines while the
+# search runs and are written as a summary next to the .trace file at the end.
+
+
+import json
+import time
+
+
+class SearchStats:
+    '''
+    Counters of one branch and bound run. Costs are reported in the numbering of the original instance:
+    cost_offset holds the number of subsets forced in by the reduction pre-pass.
+    '''
+
+    FIELDS = ('elapsed', 'nodes_popped', 'nodes_pushed', 'pruned_by_bound', 'pruned_by_table', 'bound_calls',
+              'bound_cache_hits', 'bound_time', 'dive_improvements', 'frontier', 'max_frontier', 'best_cost', 'best_open_lb', 'gap')
+
+    def __init__(self):
+        self.elapsed = 0.0
+        self.nodes_popped = 0
+        self.nodes_pushed = 0
+        self.pruned_by_bound = 0  # children and stale nodes whose bound reached the incumbent
+        self.pruned_by_table = 0  # children dominated by a state of the transposition table
+        self.bound_calls = 0
+        self.bound_cache_hits = 0  # bounds reused from the transposition table
+        self.bound_time = 0.0
+        self.dive_improvements = 0  # incumbents found by the primal dive heuristic
+        self.tier_calls = {}   # bound tier -> calls, see bnb_bounds.TieredBound
+        self.tier_prunes = {}  # bound tier -> nodes it pruned
+        self.frontier = 0
+        self.max_frontier = 0
+        self.best_cost = float('inf')
+        self.best_open_lb = float('inf')
+        self.cost_offset = 0
+
+    def update(self, elapsed, best_cost, queue, stack):
+        '''Refresh the frontier size, incumbent and best open lower bound.'''
+        self.elapsed = elapsed
+        self.frontier = len(queue) + len(stack)
+        self.max_frontier = max(self.max_frontier, self.frontier)
+        self.best_cost = best_cost
+        lbs = [node.est for node in stack]
+        if queue:
+            lbs.append(queue[0].est)  # heap minimum
+        self.best_open_lb = min(lbs + [best_cost])  # exhausted frontier: the incumbent is optimal
+
+    @property
+    def gap(self):
+        '''Relative optimality gap (best_cost - best_open_lb) / best_cost.'''
+        if self.best_cost == float('inf') or self.best_open_lb == float('inf'):
+            return None
+        total = self.best_cost + self.cost_offset
+        return max(0.0, (self.best_cost - self.best_open_lb) / total) if total else 0.0
+
+    def snapshot(self):
+        '''Statistics as a JSON-serialisable dict.'''
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        for field in ('best_cost', 'best_open_lb'):
+            data[field] = data[field] + self.cost_offset if data[field] != float('inf') else None
+        data['elapsed'] = round(self.elapsed, 6)
+        data['bound_time'] = round(self.bound_time, 6)
+        data['tiers'] = {name: {'calls': calls, 'prunes': self.tier_prunes.get(name, 0),
+                                'prune_rate': self.tier_prunes.get(name, 0) / calls}
+                         for name, calls in self.tier_calls.items()}
+        return data
+
+    def merge(self, other):
+        '''Add the counters of another run (a parallel worker) into this one.'''
+        for field in ('nodes_popped', 'nodes_pushed', 'pruned_by_bound', 'pruned_by_table', 'bound_calls',
+                      'bound_cache_hits', 'bound_time', 'dive_improvements'):
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        self.max_frontier = max(self.max_frontier, other.max_frontier)
+        for mine, theirs in ((self.tier_calls, other.tier_calls), (self.tier_prunes, other.tier_prunes)):
+            for name, count in theirs.items():
+                mine[name] = mine.get(name, 0) + count
+
+    def emit(self, stream):
+        '''Write the current statistics as one JSON line.'''
+        stream.write(json.dumps(self.snapshot()) + '\n')
+        stream.flush()
+
+
+class TimedBound:
+    '''
+    Wraps a bound engine to time its calls. A child is pruned exactly when its bound reaches the budget it was
+    given, so pruned children are counted here too.
+    '''
+
+    def __init__(self, engine, stats):
+        self.engine = engine
+        self.stats = stats
+
+    def bound(self, uncovered, start, excluded=0, warm=None, budget=float('inf')):
+        t0 = time.perf_counter()
+        result = self.engine.bound(uncovered, start, excluded, warm, budget)
+        self.stats.bound_time += time.perf_counter() - t0
+        self.stats.bound_calls += 1
+        if result[0] >= budget:
+            self.stats.pruned_by_bound += 1
+        return result
@@ -0,0 +1,63 @@
+# Transposition table for branch_and_bound.
+# Different branching paths often reach the same subproblem: the same uncovered elements with the
+# same first free subset. A state (uncovered, start, count, excluded) is dominated by an earlier
+# state with the same (uncovered, start), no more selected subsets and no more excluded subsets:
+# every cover the later state can complete is also completed by the earlier one, at no higher cost.
+# Dominated states are dropped without computing their bound, and the bounds already computed for
+# a subproblem are reused. The table keeps the most recently used entries only, and only the lower
+# bound and the subsets it used: the warm start of the bound (the n+1 Lagrangian multipliers) is
+# left to the nodes, so entries of popped or pruned nodes do not keep it alive.
+
+
+from collections import OrderedDict
+
+
+class TranspositionTable:
+    '''
+    LRU table mapping (uncovered, start) to (count, excluded, lb, used) of the best state seen.
+    Python hashes the key, the uncovered bitmask is the same int object as in the node so it is not copied.
+    '''
+
+    def __init__(self, capacity, stats=None):
+        '''
+        :param capacity: maximum number of entries, the least recently used entry is evicted first
+        :param stats: SearchStats counting the dropped states and reused bounds, optional
+        '''
+        self.capacity = capacity
+        self.stats = stats
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def bound(self, bound_engine, uncovered, start, count, excluded, warm, budget, known=None):
+        '''
+        Bound of a child state through the table.
+        :param bound_engine: engine computing the bound on a miss
+        :param uncovered, start, excluded, warm, budget: arguments of bound_engine.bound
+        :param count: number of subsets selected by the state
+        :param known: bound result already known for the state (an exclude child reusing its parent's bound)
+        :return: (lb, used, warm, fixed) like bound_engine.bound, or None if the state is dominated
+        '''
+        key = (uncovered, start)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            seen_count, seen_excluded, lb, used = entry
+            if not seen_excluded & ~excluded:  # the earlier state had every choice this one has
+                if seen_count <= count:
+                    if self.stats is not None:
+                        self.stats.pruned_by_table += 1
+                    return None
+                if known is None:
+                    if self.stats is not None:
+                        self.stats.bound_cache_hits += 1
+                    # a bound over more free subsets is still valid, its fixing used another budget so it is dropped.
+                    # The state's own warm start stands in for the one of the cached bound.
+                    known = (lb, used, warm, 0)
+        result = known if known is not None else bound_engine.bound(uncovered, start, excluded, warm, budget)
+        self.entries[key] = (count, excluded, result[0], result[1])
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        return result
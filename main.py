@@ -1,6 +1,21 @@
 import argparse
+import os
+import signal
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'LocalSearch1'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'GreedySetCover'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'LocalSearch3'))
+
+from set_cover_instance import load_instance
 from Branch_and_bound import *
-from LocalSearch_SA import run_LS1
+from bnb_bounds import BOUNDS
+from bnb_parallel import parallel_branch_and_bound
+from bnb_stats import SearchStats
+from LocalSearch_SA import run_LS1, run_LS1_seeds
+from greedy_set_cover import run_greedy
+from row_weighting import run_LS3
+from solver_control import SolverControl
 
 def parse_set_cover_instance(filename):
     """
@@ -8,90 +23,131 @@ def parse_set_cover_instance(filename):
     Args:
         filename (str): The path to the input .in file.
     Returns:
-        tuple: (universe_size, subsets)
-               - universe_size (int): Number of elements in the universe (n).
-               - subsets (list): A list of sets, where each set contains the elements
-                                 it covers. Indices correspond to the subset index + 1.
+        SetCoverInstance: subsets stored as bitmasks and CSR arrays (see set_cover_instance.py).
+                          Subset i is written as i + 1 in .sol files. None if parsing failed.
     """
-    subsets = []
-    universe_size = 0
-    num_subsets = 0
-
     try:
-        with open(filename, 'r') as f:
-            # Read the first line: n m
-            line1 = f.readline().strip().split()
-            if len(line1) == 2:
-                universe_size = int(line1[0])
-                num_subsets = int(line1[1])
-            else:
-                 print(f"Error: First line format incorrect in {filename}")
-                 return None, None
-
-            # Read subsequent lines for subsets
-            for i in range(num_subsets): # Use index i for subset number
-                 line = f.readline().strip().split()
-                 # First element is size |Si|, rest are elements
-                 # Convert elements to integers, handle potential errors
-                 try:
-                      if not line: # Handle empty lines if they occur
-                          print(f"Warning: Empty line {i+2} encountered in {filename}")
-                          continue
-                      # Expecting size followed by elements
-                      # size = int(line[0]) # We don't strictly need the size, just the elements
-                      elements = set(map(int, line[1:]))
-                      subsets.append(elements)
-                 except (ValueError, IndexError) as e:
-                      print(f"Error parsing subset line {i+2} in {filename}: {e}. Line content: '{' '.join(line)}'")
-                      return None, None # Abort parsing on error
-
-
-        # Basic validation
-        if len(subsets) != num_subsets:
-             # This might trigger if empty lines were skipped, adjust logic if needed
-             print(f"Warning: Mismatch between expected ({num_subsets}) and read ({len(subsets)}) subsets in {filename}")
-             # Decide if this is critical; for now, allow continuing
-
-        return universe_size, subsets
+        return load_instance(filename)
     except FileNotFoundError:
         print(f"Error: Input file not found: {filename}")
-        return None, None
-    except Exception as e:
+        return None
+    except (ValueError, IndexError) as e:
         print(f"Error parsing file {filename}: {e}")
-        return None, None
+        return None
 
 
 def main():
     parser = argparse.ArgumentParser(description="Minimum Set Cover Problem")  # Read the command line inputs
 
     parser.add_argument('-inst', type=str, required=True, help='Filename of the dataset')
-    parser.add_argument('-alg', type=str, choices=['BnB', 'Approx', 'LS1', 'LS2'], required=True, help='Algorithm to use')
+    parser.add_argument('-alg', type=str, choices=['BnB', 'Approx', 'LS1', 'LS2', 'LS3'], required=True, help='Algorithm to use')
     parser.add_argument('-time', type=int, required=True, help='Cutoff time in seconds')
     parser.add_argument('-seed', type=int, required=True, help='Random seed')
+    parser.add_argument('-bound', type=str, choices=sorted(BOUNDS), default='fractional', help='Lower bound used by BnB')
+    parser.add_argument('-workers', type=int, default=1, help='Number of BnB worker processes')
+    parser.add_argument('-branch', type=str, choices=sorted(BRANCHING), default='index', help='BnB branching rule')
+    parser.add_argument('-no_reduce', action='store_true', help='Skip the BnB instance reduction pre-pass')
+    parser.add_argument('-checkpoint', type=str, default=None, help='File for periodic BnB checkpoints')
+    parser.add_argument('-checkpoint_every', type=float, default=60, help='Seconds between two BnB checkpoints')
+    parser.add_argument('-resume', type=str, default=None, help='BnB checkpoint to resume from')
+    parser.add_argument('-stats_every', type=float, default=None,
+                        help='Stream BnB statistics as JSON lines to <inst>_BnB_<time>.stats.jsonl every given seconds')
+    parser.add_argument('-tt', type=int, default=2 ** 16,
+                        help='Entries of the BnB transposition table for repeated subproblems, 0 to disable')
+    parser.add_argument('-dive', type=int, default=1000,
+                        help='Nodes between two BnB primal dives improving the incumbent, 0 to disable')
+    parser.add_argument('-incumbent', type=str, default=None,
+                        help="Starting BnB upper bound: a .sol file, or 'auto' for the best .sol found for the instance")
+    parser.add_argument('-no_tiers', action='store_true',
+                        help='Compute the chosen BnB bound for every node instead of trying cheap bounds first')
+    parser.add_argument('-ls_backend', type=str, choices=['python', 'numpy'], default='python',
+                        help='LS1 move engine: Python lists or numpy arrays')
+    parser.add_argument('-ls_seeds', type=int, default=1,
+                        help='LS1 runs seeds seed..seed+k-1 in parallel processes and writes a best-of trace')
+    parser.add_argument('-ls_workers', type=int, default=None, help='LS1 worker processes, default one per CPU')
+    parser.add_argument('-mem', type=float, default=None, help='BnB queue memory budget in MB before switching to depth-first')
 
     args = parser.parse_args()
 
+    # Every algorithm stops at the cutoff or on Ctrl-C and returns the best solution it has found so far
+    control = SolverControl(args.time)
+    signal.signal(signal.SIGINT, lambda signum, frame: control.cancel())
+
     if args.alg == "BnB":
         instance = f'data/{args.inst}'  # join the folder path and instance name, like data/test1.in
         #print(instance)
-        universe, subsets  = parse_set_cover_instance(instance)  # get set cover size the subsets from .in file
-        universe = set(range(1, universe + 1))
-        best_solution, trace_log = run_branch_and_bound(universe, subsets, args.time) # run branch_and_bound method
+        instance = parse_set_cover_instance(instance)  # get set cover size the subsets from .in file
+        if instance is None:
+            return
+        incumbent = None
+        if args.incumbent == 'auto':
+            found = find_incumbent_file(instance, args.inst)
+            if found is not None:
+                print(f"Starting from {found[0]} (cost {found[1][0]})")
+                incumbent = found[1]
+        elif args.incumbent is not None:
+            try:
+                incumbent = read_incumbent_file(args.incumbent, instance)
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring incumbent {args.incumbent}: {e}")
+        stats = SearchStats()
+        telemetry = None
+        if args.stats_every and args.workers > 1:
+            print("Warning: -stats_every is only supported by the single-process BnB, ignoring it")
+        elif args.stats_every:
+            telemetry = open(f"{args.inst}_BnB_{args.time}.stats.jsonl", 'w')
+        if args.workers > 1:
+            if args.checkpoint or args.resume:
+                print("Warning: checkpoints are only supported by the single-process BnB, ignoring them")
+            best_solution, trace_log = parallel_branch_and_bound(instance, args.time, args.workers, bound=args.bound,
+                                                                  reduce=not args.no_reduce, branching=args.branch,
+                                                                  stats=stats, table_size=args.tt,
+                                                                  dive_every=args.dive, incumbent=incumbent,
+                                                                  tiered=not args.no_tiers, control=control)
+        else:
+            try:
+                best_solution, trace_log = branch_and_bound(instance, args.time, bound=args.bound,
+                                                            memory_budget=args.mem, reduce=not args.no_reduce,
+                                                            branching=args.branch, checkpoint=args.checkpoint,
+                                                            checkpoint_interval=args.checkpoint_every,
+                                                            resume=args.resume, stats=stats, telemetry=telemetry,
+                                                            telemetry_interval=args.stats_every,
+                                                            table_size=args.tt, dive_every=args.dive,
+                                                            incumbent=incumbent, tiered=not args.no_tiers,
+                                                            control=control) # run branch_and_bound method
+            except (OSError, ValueError) as e:
+                if args.resume is None:
+                    raise
+                # missing or truncated checkpoint, or one written for another instance / other settings
+                print(f"Error: cannot resume from {args.resume}: {e}")
+                if telemetry is not None:
+                    telemetry.close()
+                return
+        if telemetry is not None:
+            telemetry.close()
 
         # print(best_solution)
         write_BnB_solution_file(args.inst, args.time, best_solution) # write .sol file
         write_BnB_trace_file(args.inst, args.time, trace_log) # write .trace file
+        write_BnB_stats_file(args.inst, args.time, stats) # write search statistics next to the .trace file
 
     elif args.alg == "Approx":
-        print("Approximation algorithm not implemented yet.")
+        run_greedy(args.inst, args.time, args.seed, control)
 
     elif args.alg == "LS1":
-        run_LS1(args.inst, args.time, args.seed)
+        if args.ls_seeds > 1:
+            run_LS1_seeds(args.inst, args.time, range(args.seed, args.seed + args.ls_seeds), args.ls_backend,
+                          args.ls_workers, control)
+        else:
+            run_LS1(args.inst, args.time, args.seed, args.ls_backend, control)
         # print("Local search algorithm not implemented yet.")
     
     elif args.alg == "LS2":
         # run_LS2(args.inst, args.time, args.seed)
         print("Local search algorithm not implemented yet.")
+
+    elif args.alg == "LS3":
+        run_LS3(args.inst, args.time, args.seed, control)
     else:
         print("Unknown algorithm.")
 
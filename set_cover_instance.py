@@ -0,0 +1,247 @@
+# Shared representation of a set cover instance used by every solver.
+# Each subset is stored twice:
+#   - as an arbitrary-precision int bitmask (element e is bit e-1), so coverage
+#     tests and gains are `mask & uncovered` plus `int.bit_count()`
+#   - as a CSR element list (offsets + indices), together with the transposed
+#     CSR (element -> covering subsets), for loops that need the actual items
+# Subsets are indexed from 0 internally; .sol files use index + 1.
+#
+# A .in file can be compiled once into a binary cache (CSR arrays, transposed CSR and
+# packed bitmasks) keyed by a hash of its content:
+#     python set_cover_instance.py data/*.in
+# load_instance() then memory-maps the cache instead of re-tokenizing the text file.
+
+
+import argparse
+import hashlib
+import os
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # the cache is optional, fall back to text parsing
+    np = None
+
+CACHE_DIR = '.instance_cache'
+CACHE_MAGIC = 0x31434353  # b'SCC1'
+CACHE_VERSION = 1
+HEADER_WORDS = 8  # magic, version, n, m, nnz, mask width in bytes, digest prefix, reserved
+
+
+class SetCoverInstance:
+    '''
+    Set cover instance with bitmask and CSR views of the subsets.
+    Attributes:
+        n (int): number of elements, the universe is 1..n
+        m (int): number of subsets
+        masks (list[int]): masks[i] is the bitmask of subset i
+        offsets, indices (array): CSR, elements of subset i are indices[offsets[i]:offsets[i+1]]
+        elem_offsets, elem_indices (array): transposed CSR, subsets covering element e are
+                                            elem_indices[elem_offsets[e]:elem_offsets[e+1]]
+        universe_mask (int): bitmask with all n elements set
+    '''
+
+    __slots__ = ('n', 'm', 'masks', 'offsets', 'indices', 'elem_offsets', 'elem_indices', 'universe_mask')
+
+    def __init__(self, n, m, offsets, indices, masks=None, elem_offsets=None, elem_indices=None):
+        self.n = n
+        self.m = m
+        self.offsets = offsets
+        self.indices = indices
+        self.universe_mask = (1 << n) - 1
+        self.masks = masks if masks is not None else build_masks(n, m, offsets, indices)
+        if elem_offsets is None or elem_indices is None:
+            elem_offsets, elem_indices = transpose_csr(n, m, offsets, indices)
+        self.elem_offsets = elem_offsets
+        self.elem_indices = elem_indices
+
+    def elements(self, i):
+        '''Elements (1..n) of subset i.'''
+        return self.indices[self.offsets[i]:self.offsets[i + 1]]
+
+    def covering(self, e):
+        '''Indices of the subsets that contain element e.'''
+        return self.elem_indices[self.elem_offsets[e]:self.elem_offsets[e + 1]]
+
+    def size(self, i):
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def subset(self, i):
+        '''Subset i as a Python set, for code that still needs set semantics.'''
+        return set(self.elements(i))
+
+    def covers(self, selected):
+        '''Check whether the given 0-based subset indices cover the universe.'''
+        cov = 0
+        for i in selected:
+            cov |= self.masks[i]
+        return cov == self.universe_mask
+
+
+def build_masks(n, m, offsets, indices):
+    '''
+    Build one int bitmask per subset. Bits are set in a bytearray first so building a mask costs
+    O(n/8 + |S|) instead of one big-int shift per element.
+    '''
+    width = (n + 7) // 8
+    masks = []
+    for i in range(m):
+        buf = bytearray(width)
+        for e in indices[offsets[i]:offsets[i + 1]]:
+            b = e - 1
+            buf[b >> 3] |= 1 << (b & 7)
+        masks.append(int.from_bytes(buf, 'little'))
+    return masks
+
+
+def transpose_csr(n, m, offsets, indices):
+    '''Build the element -> subset CSR (rows 0..n, row 0 unused) from the subset -> element CSR.'''
+    counts = [0] * (n + 2)
+    for e in indices:
+        counts[e + 1] += 1
+    for e in range(1, n + 2):
+        counts[e] += counts[e - 1]
+    elem_offsets = array('q', counts)
+    fill = counts[:]
+    elem_indices = array('i', bytes(4 * len(indices)))
+    for i in range(m):
+        for e in indices[offsets[i]:offsets[i + 1]]:
+            elem_indices[fill[e]] = i
+            fill[e] += 1
+    return elem_offsets, elem_indices
+
+
+def elements_of(mask):
+    '''
+    Decode a bitmask back into the sorted list of elements (1..n) it contains. The set bits are located with
+    str.find on the binary string, which avoids one big-int operation per element.
+    '''
+    bits = bin(mask)[:1:-1]  # bits[i] is bit i
+    elements = []
+    i = bits.find('1')
+    while i >= 0:
+        elements.append(i + 1)
+        i = bits.find('1', i + 1)
+    return elements
+
+
+def parse_instance_text(filename):
+    '''
+    Parse a .in file: first line "n m", then m lines "|Si| e1 e2 ...". Blank lines are skipped
+    and the leading size field is ignored, only the listed elements are used.
+    :param filename: path to the .in file
+    :return: SetCoverInstance
+    '''
+    with open(filename, 'r') as f:
+        lines = [line for line in f.read().splitlines() if line.strip()]
+
+    n, m = map(int, lines[0].split())
+    offsets = array('q', [0])
+    indices = array('i')
+    for line in lines[1:1 + m]:
+        indices.extend(sorted(set(map(int, line.split()[1:]))))
+        offsets.append(len(indices))
+    if len(offsets) - 1 != m:
+        raise ValueError(f"expected {m} subsets in {filename}, found {len(offsets) - 1}")
+    return SetCoverInstance(n, m, offsets, indices)
+
+
+def instance_digest(filename):
+    '''Content hash of a .in file, used as the cache key.'''
+    h = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_path(filename, digest):
+    '''Location of the compiled cache of filename: <dir of .in>/.instance_cache/<name>-<digest>.bin'''
+    folder, name = os.path.split(os.path.abspath(filename))
+    return os.path.join(folder, CACHE_DIR, f"{os.path.splitext(name)[0]}-{digest[:16]}.bin")
+
+
+def compile_instance(filename):
+    '''
+    Compile a .in file into the binary cache. Layout (native byte order):
+        int64[8] header | int64 offsets[m+1] | int32 indices[nnz]
+        | int64 elem_offsets[n+2] | int32 elem_indices[nnz] | uint8 masks[m * width]
+    :param filename: path to the .in file
+    :return: path of the written cache file
+    '''
+    digest = instance_digest(filename)
+    inst = parse_instance_text(filename)
+    width = (inst.n + 7) // 8
+    header = array('q', [CACHE_MAGIC, CACHE_VERSION, inst.n, inst.m, len(inst.indices), width,
+                         int(digest[:15], 16), 0])
+    path = cache_path(filename, digest)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        for part in (header, inst.offsets, inst.indices, inst.elem_offsets, inst.elem_indices):
+            f.write(part.tobytes())
+        for mask in inst.masks:
+            f.write(mask.to_bytes(width, 'little'))
+    os.replace(tmp, path)  # never leave a half-written cache behind
+    return path
+
+
+def load_cached_instance(path, digest):
+    '''
+    Memory-map a compiled cache and rebuild the instance from it.
+    :return: SetCoverInstance, or None if the cache is missing, stale or corrupted
+    '''
+    if np is None or not os.path.exists(path):
+        return None
+    try:
+        mm = np.memmap(path, dtype=np.uint8, mode='r')  # ValueError on an empty file, OSError if unreadable
+        if mm.size < 8 * HEADER_WORDS:
+            return None
+        magic, version, n, m, nnz, width, key, _ = mm[:8 * HEADER_WORDS].view(np.int64).tolist()
+    except (OSError, ValueError):
+        return None
+    if magic != CACHE_MAGIC or version != CACHE_VERSION or key != int(digest[:15], 16):
+        return None
+    sizes = (8 * (m + 1), 4 * nnz, 8 * (n + 2), 4 * nnz, m * width)
+    if mm.size != 8 * HEADER_WORDS + sum(sizes):
+        return None
+
+    parts = []
+    pos = 8 * HEADER_WORDS
+    for typecode, size in zip('qiqi', sizes):
+        part = array(typecode)
+        part.frombytes(mm[pos:pos + size])
+        parts.append(part)
+        pos += size
+    offsets, indices, elem_offsets, elem_indices = parts
+    packed = memoryview(mm[pos:pos + m * width])
+    masks = [int.from_bytes(packed[i * width:(i + 1) * width], 'little') for i in range(m)]
+    return SetCoverInstance(n, m, offsets, indices, masks, elem_offsets, elem_indices)
+
+
+def load_instance(filename, use_cache=True):
+    '''
+    Load a set cover instance, from its compiled cache when one is present and valid, otherwise
+    from the .in text file.
+    :param filename: path to the .in file
+    :param use_cache: set False to always parse the text file
+    :return: SetCoverInstance
+    '''
+    if use_cache and np is not None:
+        digest = instance_digest(filename)
+        inst = load_cached_instance(cache_path(filename, digest), digest)
+        if inst is not None:
+            return inst
+    return parse_instance_text(filename)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile set cover .in files into the binary instance cache")
+    parser.add_argument('files', nargs='+', help='.in files to compile')
+    args = parser.parse_args()
+    for filename in args.files:
+        try:
+            print(f"{filename} -> {compile_instance(filename)}")
+        except (OSError, ValueError) as e:
+            print(f"Error compiling {filename}: {e}", file=sys.stderr)
@@ -0,0 +1,91 @@
+# Common protocol of the solvers (BnB, Approx, LS1, LS2).
+# A solver run gets a SolverControl and
+#   - polls control.expired() in its main loop, and stops as soon as it returns True (the cutoff is
+#     reached or someone called control.cancel(), e.g. on Ctrl-C)
+#   - reports every improved cover with control.offer(cost, subsets), subsets 1-based like in .sol files
+# The incumbent can be read at any time from any thread with control.incumbent(), so the best cover
+# found so far is never lost, and no solver needs a watchdog thread to enforce the cutoff.
+# Process pools (LS1 seeds, LS2 restarts) give every worker a control built on one multiprocessing.Event,
+# and the parent sets it from as_completed() once its own control is cancelled.
+
+
+import concurrent.futures
+import threading
+import time
+
+
+class SolverControl:
+    '''
+    Deadline, cancellation token and shared incumbent of one solver run.
+    Attributes:
+        start_time (float): time.time() at which the run started
+        deadline (float): time.time() at which the solver must return
+        trace (list[tuple[float, int]]): (seconds since start_time, cost) of every accepted offer
+    '''
+
+    def __init__(self, cutoff, start_time=None, cancel_event=None):
+        '''
+        :param cutoff: seconds the solver may run
+        :param start_time: start of the run, default now. Processes of a parallel run pass the parent's start time
+        :param cancel_event: multiprocessing.Event shared by the processes of a parallel run, default a private one
+        '''
+        self.start_time = time.time() if start_time is None else start_time
+        self.deadline = self.start_time + cutoff
+        self.trace = []
+        self._cancelled = cancel_event if cancel_event is not None else threading.Event()
+        self._lock = threading.Lock()
+        self._best = None
+
+    def resume(self, elapsed):
+        '''Count elapsed seconds spent by an earlier run (e.g. a resumed checkpoint) against the cutoff.'''
+        self.start_time -= elapsed
+        self.deadline -= elapsed
+
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.time())
+
+    def cancel(self):
+        '''Ask the solver to stop at its next check.'''
+        self._cancelled.set()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def expired(self):
+        '''True once the deadline has passed or the run was cancelled.'''
+        return self._cancelled.is_set() or time.time() >= self.deadline
+
+    def offer(self, cost, subsets):
+        '''
+        Report a cover. It becomes the incumbent if it is cheaper than the current one.
+        :param subsets: 1-based subset indices
+        :return: True if the incumbent improved
+        '''
+        with self._lock:
+            if self._best is not None and cost >= self._best[0]:
+                return False
+            self._best = (cost, list(subsets))
+            self.trace.append((self.elapsed(), cost))
+            return True
+
+    def incumbent(self):
+        '''(cost, 1-based subset indices) of the best cover offered so far, None if there is none.'''
+        with self._lock:
+            return self._best
+
+
+def as_completed(futures, control, cancel_event):
+    '''
+    concurrent.futures.as_completed for a process pool whose workers poll cancel_event: the event is set as soon
+    as control is cancelled (e.g. by Ctrl-C in the parent), then the futures keep being yielded as they finish.
+    '''
+    pending = set(futures)
+    while pending:
+        if control.cancelled():
+            cancel_event.set()
+        done, pending = concurrent.futures.wait(pending, timeout=0.1,
+                                                return_when=concurrent.futures.FIRST_COMPLETED)
+        yield from done